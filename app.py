@@ -1,8 +1,14 @@
 """Streamlit UI for the Market Research Agent."""
 
 import asyncio
+import atexit
 import os
+import queue
+import threading
+import time
+from functools import partial
 
+import orjson
 import streamlit as st
 
 from src.models import ResearchBrief
@@ -387,6 +393,74 @@ def validate_intake(data: dict) -> list[str]:
     return errors
 
 
+@st.cache_resource
+def _research_loop() -> asyncio.AbstractEventLoop:
+    """Process-wide event loop that research runs on, in a background thread.
+
+    Agents keep one API client per loop and the source checker one HTTP
+    session, so sharing this loop keeps both connection pools warm across
+    research runs and browser sessions. They are closed at interpreter exit.
+    """
+    loop = asyncio.new_event_loop()
+    # Python 3.12+: tasks that finish without awaiting skip the scheduler
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    thread = threading.Thread(
+        target=_serve_research_loop, args=(loop,), name="research-loop", daemon=True
+    )
+    thread.start()
+    atexit.register(_stop_research_loop, loop, thread)
+    return loop
+
+
+def _serve_research_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Run *loop* until it is stopped, then shut it down like ``asyncio.run``."""
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
+
+
+def _stop_research_loop(loop: asyncio.AbstractEventLoop, thread: threading.Thread) -> None:
+    """Close the research loop's API client and HTTP session, then stop it."""
+    if loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(ResearchOrchestrator.aclose(), loop).result(timeout=5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+
+def _run_on_research_loop(coro_fn):
+    """Run ``coro_fn(post)`` on the research loop and return its result.
+
+    Streamlit calls only work on the script thread, so the coroutine hands
+    them to ``post`` and this thread runs them while it waits. If the script
+    is stopped (e.g. the user reruns it), the research run is cancelled.
+    """
+    updates: queue.SimpleQueue = queue.SimpleQueue()
+    future = asyncio.run_coroutine_threadsafe(coro_fn(updates.put), _research_loop())
+    try:
+        while not future.done() or not updates.empty():
+            try:
+                update = updates.get(timeout=UI_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            update()
+    except BaseException:
+        future.cancel()
+        raise
+    return future.result()
+
+
 def display_progress(wave_index: int, wave_name: str, status: str):
     """Display progress for a wave with modern styling."""
     status_config = {
@@ -410,16 +484,49 @@ def display_progress(wave_index: int, wave_name: str, status: str):
     )
 
 
-async def run_research(brief: ResearchBrief) -> dict:
-    """Run the research with progress display. Returns results dict."""
-    orchestrator = ResearchOrchestrator()
+# Per-agent status icons shown under the running wave
+AGENT_STATUS_ICONS = {"running": "🔄", "complete": "✅", "error": "❌"}
+
+# Minimum seconds between redraws of the report while it streams in
+REPORT_REFRESH_SECONDS = 0.25
+
+# How often the script thread checks whether a research run has finished
+UI_POLL_SECONDS = 0.05
+
+
+def _report_stream(placeholder, post):
+    """Return an on_text callback that shows the streaming report in *placeholder*.
+
+    Redraws are handed to *post* for the script thread, and throttled since
+    each one re-renders the whole report so far.
+    """
+    chunks: list[str] = []
+    last_draw = 0.0
+
+    def on_text(delta: str) -> None:
+        nonlocal last_draw
+        chunks.append(delta)
+        now = time.monotonic()
+        if now - last_draw >= REPORT_REFRESH_SECONDS:
+            last_draw = now
+            post(partial(placeholder.markdown, "".join(chunks)))
+
+    return on_text
 
-    progress_placeholder = st.empty()
-    wave_statuses = ["pending"] * 5
 
-    for wave_idx in range(5):
-        wave_statuses[wave_idx] = "running"
+def run_research(brief: ResearchBrief, no_cache: bool = False) -> dict:
+    """Run the research with progress display. Returns results dict.
 
+    The agents run on the shared research loop; progress updates come back
+    to this thread to be drawn. With *no_cache* every agent calls the API
+    even if an identical request was answered before.
+    """
+    orchestrator = ResearchOrchestrator(no_cache=no_cache)
+
+    progress_placeholder = st.empty()
+    report_placeholder = st.empty()
+
+    def draw_progress(wave_statuses: list[str], agent_statuses: dict[str, str]) -> None:
         with progress_placeholder.container():
             st.markdown(
                 """
@@ -437,14 +544,51 @@ async def run_research(brief: ResearchBrief) -> dict:
             )
             for idx, status in enumerate(wave_statuses):
                 display_progress(idx, orchestrator.get_wave_description(idx), status)
-
-        try:
-            await orchestrator.run_wave(wave_idx, brief)
-            wave_statuses[wave_idx] = "complete"
-        except Exception as e:
-            wave_statuses[wave_idx] = "error"
-            st.error(f"Error in {orchestrator.get_wave_description(wave_idx)}: {e}")
-
+                if status == "running" and len(agent_statuses) > 1:
+                    st.caption(" · ".join(
+                        f"{AGENT_STATUS_ICONS[agent_status]} {name}"
+                        for name, agent_status in agent_statuses.items()
+                    ))
+
+    async def research(post) -> None:
+        wave_statuses = ["pending"] * 5
+        # Status of each agent in the running wave, updated as agents finish
+        agent_statuses: dict[str, str] = {}
+
+        def post_progress() -> None:
+            # Snapshot the statuses: the script thread draws them later
+            post(partial(draw_progress, list(wave_statuses), dict(agent_statuses)))
+
+        def on_agent_complete(agent_name: str, result: dict) -> None:
+            agent_statuses[agent_name] = "error" if "error" in result else "complete"
+            post_progress()
+
+        on_report_text = _report_stream(report_placeholder, post)
+        for wave_idx in range(5):
+            wave_statuses[wave_idx] = "running"
+            agent_statuses = dict.fromkeys(orchestrator.waves[wave_idx], "running")
+            post_progress()
+
+            try:
+                wave_results = await orchestrator.run_wave(
+                    wave_idx, brief,
+                    on_agent_complete=on_agent_complete,
+                    on_report_text=on_report_text,
+                )
+                wave_statuses[wave_idx] = "complete"
+                # Show the finished report while verification runs: the last
+                # chunk may have been throttled, and a retried request streams
+                # its text again from the start
+                report = wave_results.get("OpportunitySynthesizer", {}).get("response")
+                if isinstance(report, str):
+                    post(partial(report_placeholder.markdown, report))
+            except Exception as e:
+                wave_statuses[wave_idx] = "error"
+                post(partial(
+                    st.error, f"Error in {orchestrator.get_wave_description(wave_idx)}: {e}"
+                ))
+
+    _run_on_research_loop(research)
     return orchestrator.results
 
 
@@ -489,7 +633,7 @@ def display_confirmation(brief: ResearchBrief):
         unsafe_allow_html=True,
     )
 
-    st.markdown(brief.to_markdown())
+    st.markdown(brief.markdown)
 
     # Estimated time based on depth
     time_estimates = {
@@ -501,12 +645,25 @@ def display_confirmation(brief: ResearchBrief):
 
     st.info(f"Estimated time: **{est_time}** | Depth: **{brief.depth.replace('_', ' ').title()}**")
 
+    fresh = st.checkbox(
+        "Run fresh research (ignore cached results from earlier runs of this brief)",
+        value=False,
+    )
+
     col1, col2, col3 = st.columns([1, 1, 1])
 
     with col1:
         if st.button("Confirm & Start Research", type="primary", use_container_width=True):
-            st.session_state.view = "running"
-            st.rerun()
+            # Fail fast here rather than in every agent of every wave
+            if not os.environ.get("ANTHROPIC_API_KEY"):
+                st.error(
+                    "ANTHROPIC_API_KEY environment variable is not set. "
+                    "Set it with: export ANTHROPIC_API_KEY=sk-ant-..."
+                )
+            else:
+                st.session_state.no_cache = fresh
+                st.session_state.view = "running"
+                st.rerun()
 
     with col2:
         if st.button("Edit Brief", use_container_width=True):
@@ -520,6 +677,11 @@ def display_confirmation(brief: ResearchBrief):
             st.rerun()
 
 
+def _json_text(data) -> str:
+    """Serialize an agent result for st.json, which otherwise runs json.dumps."""
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 def display_results():
     """Display research results and export options from session state."""
     results = st.session_state.results
@@ -546,12 +708,12 @@ def display_results():
         elif isinstance(report, dict) and "response" in report:
             st.markdown(report["response"])
         else:
-            st.json(report)
+            st.json(_json_text(report))
 
     if "SourceVerifier" in results:
         verification = results["SourceVerifier"]
         with st.expander("Source Verification Details"):
-            st.json(verification)
+            st.json(_json_text(verification))
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -631,7 +793,7 @@ def display_results():
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
         if st.button("Start New Research", type="primary", use_container_width=True):
-            for key in ["view", "intake_data", "brief", "results"]:
+            for key in ["view", "intake_data", "brief", "results", "no_cache"]:
                 st.session_state.pop(key, None)
             st.rerun()
 
@@ -690,7 +852,7 @@ def main():
             st.session_state.view = "intake"
             st.rerun()
 
-        results = asyncio.run(run_research(brief))
+        results = run_research(brief, no_cache=st.session_state.get("no_cache", False))
         st.session_state.results = results
         st.session_state.view = "results"
         st.rerun()
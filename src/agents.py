@@ -1,15 +1,25 @@
 """Research sub-agents for market research."""
 
-import json
+import asyncio
+import functools
+import hashlib
 import logging
 import os
-import time
+import random
+import weakref
+from collections import OrderedDict
+from collections.abc import Collection, Mapping
 from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Callable, ClassVar, Optional
 
 import anthropic
+import orjson
 from anthropic import APIError, APITimeoutError, RateLimitError
 
 from src.models import ResearchBrief
+from src.schemas import AGENT_SCHEMAS
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +28,133 @@ MODEL = os.environ.get("RESEARCH_MODEL", "claude-sonnet-4-20250514")
 MAX_TOKENS = int(os.environ.get("RESEARCH_MAX_TOKENS", "8192"))
 MAX_RETRIES = 3
 RETRY_BASE_DELAY = 2  # seconds
+# HTTP 529 overloaded_error is transient, so it gets a longer retry budget
+OVERLOADED_STATUS = 529
+OVERLOADED_MAX_RETRIES = 5
 API_TIMEOUT = 120  # seconds
+# Max concurrent API requests per event loop (keeps fan-out under RPM/TPM limits)
+MAX_CONCURRENCY = int(os.environ.get("RESEARCH_MAX_CONCURRENCY", "5"))
+# Max cached API responses kept in-process: 0 disables the in-process cache
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESEARCH_RESPONSE_CACHE_SIZE", "64"))
+# Directory for an on-disk response cache that survives restarts (unset disables it)
+RESPONSE_CACHE_DIR = os.environ.get("RESEARCH_RESPONSE_CACHE_DIR", "")
+
+# Successful API responses keyed by prompt hash (LRU order, oldest first)
+_response_cache: OrderedDict[str, dict] = OrderedDict()
+
+
+def _cache_key(agent_name: str, prompt: str, max_tokens: int) -> str:
+    """Hash the request parameters that determine an API response."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{MODEL}\0{max_tokens}\0{agent_name}\0".encode())
+    digest.update(prompt.encode())
+    return digest.hexdigest()
+
+
+def _remember_response(key: str, result: dict) -> None:
+    """Add a response to the in-process LRU, evicting the oldest entries."""
+    if RESPONSE_CACHE_SIZE <= 0:
+        return
+    _response_cache[key] = result
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
+
+def _load_cached_response(key: str) -> Optional[dict]:
+    """Look up a cached response in memory, then on disk."""
+    cached = _response_cache.get(key)
+    if cached is not None:
+        _response_cache.move_to_end(key)
+        return cached
+    if not RESPONSE_CACHE_DIR:
+        return None
+    try:
+        cached = orjson.loads(Path(RESPONSE_CACHE_DIR, f"{key}.json").read_bytes())
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning("Ignoring unreadable response cache entry %s: %s", key, e)
+        return None
+    _remember_response(key, cached)
+    return cached
+
+
+def _store_response(key: str, result: dict) -> None:
+    """Cache a response in memory and, if configured, on disk."""
+    _remember_response(key, dict(result))
+    if not RESPONSE_CACHE_DIR:
+        return
+    cache_dir = Path(RESPONSE_CACHE_DIR)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_dir / f"{key}.json.tmp"
+        tmp_path.write_bytes(orjson.dumps(result, default=str))
+        os.replace(tmp_path, cache_dir / f"{key}.json")
+    except (OSError, TypeError) as e:
+        logger.warning("Could not write response cache entry %s: %s", key, e)
+
+
+def clear_response_cache() -> None:
+    """Drop all cached API responses."""
+    _response_cache.clear()
+
+
+def _parse_text_response(text: str) -> dict:
+    """Parse a JSON object response, wrapping other text as ``{"response": text}``.
+
+    Markdown replies (e.g. the synthesis report) skip the parse attempt
+    entirely instead of going through a decode error.
+    """
+    if text.lstrip()[:1] == "{":
+        try:
+            parsed = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            if isinstance(parsed, dict):
+                return parsed
+    return {"response": text}
+
+
+def _split_prompt(prompt: str, cache_prefix: str = "") -> tuple[list[dict], str]:
+    """Split *prompt* into cacheable system blocks and the user message.
+
+    A static *cache_prefix* (persona, quality lens, search protocol) becomes
+    a system block marked for Anthropic prompt caching; the rest of the
+    prompt is the user message.
+    """
+    if not cache_prefix or not prompt.startswith(cache_prefix) or prompt == cache_prefix:
+        return [], prompt
+    system = [{"type": "text", "text": cache_prefix, "cache_control": {"type": "ephemeral"}}]
+    return system, prompt[len(cache_prefix):]
+
+
+# Forced tool call used to get structured JSON findings from the API
+FINDINGS_TOOL_NAME = "record_findings"
+
+
+def _findings_tool(agent_name: str, keys: Collection[str] = ()) -> dict:
+    """Build the tool definition whose input schema holds an agent's findings.
+
+    The schema lists the agent's expected result keys, or only *keys* when
+    the agent reads just part of what the API could return.
+    """
+    expected = keys or AGENT_SCHEMAS.get(agent_name, frozenset()) - {"response"}
+    return {
+        "name": FINDINGS_TOOL_NAME,
+        "description": f"Record the structured research findings of {agent_name}.",
+        "input_schema": {
+            "type": "object",
+            "properties": {key: {} for key in sorted(expected)},
+            "additionalProperties": True,
+        },
+    }
+
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff for *attempt* (1-based) with up to 1s of jitter."""
+    return RETRY_BASE_DELAY * (2 ** (attempt - 1)) + random.uniform(0, 1)
 
 
 def _get_api_key() -> str:
@@ -31,6 +167,47 @@ def _get_api_key() -> str:
         )
     return api_key
 
+
+# One AsyncAnthropic client and request semaphore per event loop, so each
+# run reuses a single HTTP connection pool (neither can be shared across loops).
+_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _get_client() -> anthropic.AsyncAnthropic:
+    """Return the AsyncAnthropic client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = anthropic.AsyncAnthropic(api_key=_get_api_key())
+    return client
+
+
+async def close_client() -> None:
+    """Close the running event loop's AsyncAnthropic client, if it has one."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore bounding API requests on the running event loop."""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(max(MAX_CONCURRENCY, 1))
+    return semaphore
+
+
+def _retry_after(error: APIError) -> float:
+    """Seconds the API asked us to wait via the retry-after header, or 0."""
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after", 0))
+    except (AttributeError, TypeError, ValueError):
+        return 0.0
+
+
 # Research Persona - shared by all agents
 RESEARCH_PERSONA = """
 ## Research Persona
@@ -60,8 +237,8 @@ For each source: FIND → EVALUATE → INCLUDE/SKIP → REPEAT
 - Weak on all → Skip UNLESS it's the only source on this subtopic
 """
 
-# Agent-specific quality lenses
-QUALITY_LENSES = {
+# Agent-specific quality lenses (read-only)
+QUALITY_LENSES = MappingProxyType({
     "CommunityMapper": """
 ## Quality Lens: Community Mapper
 *"A ghost town subreddit isn't a community, it's a graveyard."*
@@ -116,32 +293,37 @@ QUALITY_LENSES = {
 **Gold signals:** Nairaland posts, local Twitter, pricing in local currency, payment discussions from actual users
 **Context:** A 2020 report on "African internet penetration" is useless - things change fast. Recent local voices matter more than consultant overviews.
 """,
-}
+})
 
 # Depth-based search configuration
 # Based on Anthropic's deep research protocol: multi-round, iterative, exhaustive
 # NOTE: No arbitrary minimums - depth determines WHEN to stop, not minimum counts
-SEARCH_CONFIG = {
-    "overview": {
+# Read-only: cached prompt builders depend on these values never changing.
+SEARCH_CONFIG = MappingProxyType({
+    "overview": MappingProxyType({
         "stop_when": "Major platforms covered, obvious sources found",
         "behavior": "Find the prominent, obvious sources quickly",
         "description": "Quick sweep of the landscape",
-    },
-    "thorough": {
+    }),
+    "thorough": MappingProxyType({
         "stop_when": "Search variations returning mostly duplicates",
         "behavior": "Comprehensive coverage, follow leads, check secondary sources",
         "description": "Diligent researcher-level thoroughness",
-    },
-    "deep_dive": {
+    }),
+    "deep_dive": MappingProxyType({
         "stop_when": "Literally run out of new things to search",
         "behavior": "EXHAUSTIVE - leave no stone unturned, find EVERYTHING",
         "description": "Would bet money nothing significant left to find",
-    },
-}
+    }),
+})
 
 
+@functools.lru_cache(maxsize=32)
 def get_vicious_search_instructions(depth: str, agent_type: str) -> str:
-    """Generate aggressive multi-round search instructions based on depth."""
+    """Generate aggressive multi-round search instructions based on depth.
+
+    Outputs depend only on the two arguments, so they are cached.
+    """
     config = SEARCH_CONFIG.get(depth, SEARCH_CONFIG["thorough"])
     quality_lens = QUALITY_LENSES.get(agent_type, "")
 
@@ -216,65 +398,240 @@ Don't over-index on one platform. Check ALL relevant:
 """
 
 
-@dataclass
+# Warm the cache for every (depth, agent) pair before the first run
+for _depth in SEARCH_CONFIG:
+    for _agent_type in QUALITY_LENSES:
+        get_vicious_search_instructions(_depth, _agent_type)
+del _depth, _agent_type
+
+
+# brief._prompt_cache entry for the shared prompt variables (prompt entries
+# are keyed by agent tuples, so a plain string cannot collide)
+_PROMPT_VARS_KEY = "prompt_vars"
+
+
+def _cached_prompt(build_prompt):
+    """Memoize a ``build_prompt(self, brief)`` method on the brief.
+
+    Prompts are pure functions of the agent identity and the (frozen)
+    brief, so retries and repeated runs reuse the first rendering.
+    """
+
+    @functools.wraps(build_prompt)
+    def wrapper(self, brief: ResearchBrief) -> str:
+        key = (type(self).__qualname__, self.name, self.mission)
+        cache = brief._prompt_cache
+        prompt = cache.get(key)
+        if prompt is None:
+            prompt = cache[key] = build_prompt(self, brief)
+        return prompt
+
+    return wrapper
+
+
+# Shared layout of the research agent prompts. The prefix depends only on
+# the agent and the depth, so it is rendered once and sent as a cached
+# system block.
+_AGENT_PREFIX_TEMPLATE = """
+You are {name}, a specialized research agent.
+
+Mission: {mission}
+
+{search_instructions}
+
+"""
+_AGENT_PROMPT_TEMPLATE = """## Research Brief
+
+{brief_lines}
+
+## Your Task
+
+{task}"""
+
+
+@functools.lru_cache(maxsize=64)
+def _static_prompt_prefix(name: str, mission: str, depth: str) -> str:
+    """Render the brief-independent head of an agent prompt."""
+    return _AGENT_PREFIX_TEMPLATE.format(
+        name=name,
+        mission=mission,
+        search_instructions=get_vicious_search_instructions(depth, name),
+    )
+
+
+@dataclass(slots=True)
 class SubAgent:
-    """Base class for research sub-agents."""
+    """Base class for research sub-agents.
+
+    Fields are stored in ``__slots__`` and subclasses declare empty
+    ``__slots__``, so agent instances carry no ``__dict__``. Patch methods on
+    the agent class rather than on an instance.
+    """
 
     name: str
     mission: str = ""
 
-    def get_search_config(self, depth: str) -> dict:
+    # Force JSON output through the findings tool; text-mode agents opt out
+    json_output: ClassVar[bool] = True
+    # Keys the findings tool asks for; empty means the agent's full schema
+    findings_keys: ClassVar[tuple[str, ...]] = ()
+    # Stream the response (long outputs); deltas go to the on_text callback
+    stream_output: ClassVar[bool] = False
+    # Output token budget per call, capped by MAX_TOKENS
+    max_output_tokens: ClassVar[int] = 4096
+    # Prompt data: (label, template) brief lines and the task section
+    brief_fields: ClassVar[tuple[tuple[str, str], ...]] = ()
+    task: ClassVar[str] = ""
+
+    def get_search_config(self, depth: str) -> Mapping[str, str]:
         """Get search configuration for the given depth."""
         return SEARCH_CONFIG.get(depth, SEARCH_CONFIG["thorough"])
 
+    @_cached_prompt
     def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build the prompt for this agent given a research brief."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        return f"""
-You are {self.name}, a specialized research agent.
-
-Mission: {self.mission}
-
-{search_instructions}
+        """Build the prompt for this agent given a research brief.
 
-Research Brief:
-{brief.to_markdown()}
+        Subclasses describe their prompt as data: ``brief_fields`` picks the
+        brief lines to show and ``task`` is the task section. Both are
+        ``str.format`` templates over ``prompt_vars(brief)``.
+        """
+        prefix = self.prompt_prefix(brief.depth)
+        if not self.task:
+            return f"""{prefix}Research Brief:
+{brief.markdown}
 
 Conduct your research and return structured findings with ALL source URLs.
 """
 
-    async def _call_api(self, prompt: str) -> dict:
-        """Call the Anthropic API with retry logic and error handling."""
-        client = anthropic.Anthropic(api_key=_get_api_key())
+        prompt_vars = self.prompt_vars(brief)
+        brief_lines = "\n".join(
+            f"**{label}:** {value.format_map(prompt_vars)}"
+            for label, value in self.brief_fields
+        )
+        return prefix + _AGENT_PROMPT_TEMPLATE.format_map(
+            {"brief_lines": brief_lines, "task": self.task.format_map(prompt_vars)}
+        )
+
+    def prompt_prefix(self, depth: str) -> str:
+        """Return the static head shared by every prompt of this agent at *depth*."""
+        return _static_prompt_prefix(self.name, self.mission, depth)
+
+    def prompt_vars(self, brief: ResearchBrief) -> Mapping[str, object]:
+        """Values available to the ``brief_fields`` and ``task`` templates.
+
+        They depend only on the brief, so they are derived once per brief and
+        every agent in the run shares the same read-only mapping.
+        """
+        cache = brief._prompt_cache
+        prompt_vars = cache.get(_PROMPT_VARS_KEY)
+        if prompt_vars is None:
+            values = brief.to_dict()
+            values["pricing_model"] = brief.offering_pricing_model or "Not specified"
+            values["competitors"] = (
+                ", ".join(brief.known_competitors) if brief.known_competitors else "None specified"
+            )
+            prompt_vars = cache[_PROMPT_VARS_KEY] = MappingProxyType(values)
+        return prompt_vars
+
+    async def _call_api(
+        self,
+        prompt: str,
+        no_cache: bool = False,
+        cache_prefix: str = "",
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> dict:
+        """Call the Anthropic API with retry logic and error handling.
+
+        Identical prompts are served from an in-process LRU cache unless
+        *no_cache* is set. Cache hits report zero token usage.
+
+        If *prompt* starts with *cache_prefix*, the prefix is sent as a
+        system block marked for Anthropic prompt caching.
+
+        Agents with ``stream_output`` stream the response and pass each text
+        delta to *on_text* as it arrives (a retried attempt streams again from
+        the start). A cached text response is passed to *on_text* whole, so
+        callers see the report either way.
+        """
+        max_tokens = min(self.max_output_tokens, MAX_TOKENS)
+        use_cache = (RESPONSE_CACHE_SIZE > 0 or bool(RESPONSE_CACHE_DIR)) and not no_cache
+        if use_cache:
+            key = _cache_key(self.name, prompt, max_tokens)
+            cached = _load_cached_response(key)
+            if cached is not None:
+                logger.info("Agent %s served from response cache", self.name)
+                result = dict(cached)
+                if on_text is not None and self.stream_output:
+                    text = result.get("response")
+                    if isinstance(text, str):
+                        on_text(text)
+                result["_token_usage"] = {"input_tokens": 0, "output_tokens": 0}
+                return result
+
+        client = _get_client()
+        system, user_content = _split_prompt(prompt, cache_prefix)
 
         last_exception = None
-        for attempt in range(1, MAX_RETRIES + 1):
+        max_attempts = MAX_RETRIES
+        attempt = 0
+        while attempt < max_attempts:
+            attempt += 1
             try:
                 logger.info(
                     "Agent %s calling API (attempt %d/%d, model=%s, max_tokens=%d)",
-                    self.name, attempt, MAX_RETRIES, MODEL, MAX_TOKENS,
+                    self.name, attempt, max_attempts, MODEL, max_tokens,
                 )
 
-                response = client.messages.create(
-                    model=MODEL,
-                    max_tokens=MAX_TOKENS,
-                    messages=[{"role": "user", "content": prompt}],
-                    timeout=API_TIMEOUT,
-                )
+                request = {
+                    "model": MODEL,
+                    "max_tokens": max_tokens,
+                    "messages": [{"role": "user", "content": user_content}],
+                    "timeout": API_TIMEOUT,
+                }
+                if system:
+                    request["system"] = system
+                if self.json_output:
+                    request["tools"] = [_findings_tool(self.name, self.findings_keys)]
+                    request["tool_choice"] = {"type": "tool", "name": FINDINGS_TOOL_NAME}
+
+                async with _get_semaphore():
+                    if self.stream_output:
+                        async with client.messages.stream(**request) as stream:
+                            async for delta in stream.text_stream:
+                                if on_text is not None:
+                                    on_text(delta)
+                            response = await stream.get_final_message()
+                    else:
+                        response = await client.messages.create(**request)
 
                 # Validate response structure
                 if not response.content:
                     raise ValueError(f"API returned empty content for agent {self.name}")
 
+                if getattr(response, "stop_reason", None) == "max_tokens":
+                    logger.warning(
+                        "Agent %s hit its output budget (max_tokens=%d); findings may be truncated",
+                        self.name, max_tokens,
+                    )
+
+                # Forced tool calls arrive already parsed
+                tool_input = next(
+                    (
+                        block.input for block in response.content
+                        if getattr(block, "type", None) == "tool_use"
+                    ),
+                    None,
+                )
+
                 content_block = response.content[0]
-                if not hasattr(content_block, "text") or not content_block.text:
+                if tool_input is None and (
+                    not hasattr(content_block, "text") or not content_block.text
+                ):
                     raise ValueError(
                         f"API returned non-text content for agent {self.name}: "
                         f"{type(content_block).__name__}"
                     )
 
-                text = content_block.text
-
                 # Extract token usage
                 token_usage = {"input_tokens": 0, "output_tokens": 0}
                 if hasattr(response, "usage"):
@@ -289,11 +646,14 @@ Conduct your research and return structured findings with ALL source URLs.
                         token_usage["output_tokens"],
                     )
 
-                # Try to parse as JSON, otherwise wrap in dict
-                try:
-                    result = json.loads(text)
-                except json.JSONDecodeError:
-                    result = {"response": text}
+                if tool_input is not None:
+                    result = dict(tool_input)
+                else:
+                    # Text fallback: parse JSON objects, wrap anything else
+                    result = _parse_text_response(content_block.text)
+
+                if use_cache:
+                    _store_response(key, result)
 
                 # Attach token usage metadata
                 result["_token_usage"] = token_usage
@@ -301,31 +661,45 @@ Conduct your research and return structured findings with ALL source URLs.
 
             except RateLimitError as e:
                 last_exception = e
-                delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
-                logger.warning(
-                    "Agent %s rate limited (attempt %d/%d), retrying in %ds: %s",
-                    self.name, attempt, MAX_RETRIES, delay, e,
-                )
-                time.sleep(delay)
+                if attempt < max_attempts:
+                    delay = max(_backoff_delay(attempt), _retry_after(e))
+                    logger.warning(
+                        "Agent %s rate limited (attempt %d/%d), retrying in %.1fs: %s",
+                        self.name, attempt, max_attempts, delay, e,
+                    )
+                    await asyncio.sleep(delay)
+                else:
+                    logger.warning(
+                        "Agent %s rate limited (attempt %d/%d), giving up: %s",
+                        self.name, attempt, max_attempts, e,
+                    )
 
             except APITimeoutError as e:
                 last_exception = e
                 logger.warning(
                     "Agent %s timed out (attempt %d/%d): %s",
-                    self.name, attempt, MAX_RETRIES, e,
+                    self.name, attempt, max_attempts, e,
                 )
-                if attempt < MAX_RETRIES:
-                    time.sleep(RETRY_BASE_DELAY)
+                if attempt < max_attempts:
+                    await asyncio.sleep(RETRY_BASE_DELAY)
 
             except APIError as e:
                 last_exception = e
-                if e.status_code and e.status_code >= 500:
-                    delay = RETRY_BASE_DELAY * (2 ** (attempt - 1))
+                status_code = getattr(e, "status_code", None)
+                if status_code == OVERLOADED_STATUS:
+                    max_attempts = max(max_attempts, OVERLOADED_MAX_RETRIES)
+                if status_code and status_code >= 500 and attempt < max_attempts:
+                    delay = _backoff_delay(attempt)
+                    logger.warning(
+                        "Agent %s server error %d (attempt %d/%d), retrying in %.1fs",
+                        self.name, status_code, attempt, max_attempts, delay,
+                    )
+                    await asyncio.sleep(delay)
+                elif status_code and status_code >= 500:
                     logger.warning(
-                        "Agent %s server error %d (attempt %d/%d), retrying in %ds",
-                        self.name, e.status_code, attempt, MAX_RETRIES, delay,
+                        "Agent %s server error %d (attempt %d/%d), giving up",
+                        self.name, status_code, attempt, max_attempts,
                     )
-                    time.sleep(delay)
                 else:
                     logger.error("Agent %s API error (non-retryable): %s", self.name, e)
                     raise
@@ -337,49 +711,37 @@ Conduct your research and return structured findings with ALL source URLs.
         # All retries exhausted
         logger.error(
             "Agent %s failed after %d attempts: %s",
-            self.name, MAX_RETRIES, last_exception,
+            self.name, attempt, last_exception,
         )
         raise RuntimeError(
-            f"Agent {self.name} failed after {MAX_RETRIES} attempts: {last_exception}"
+            f"Agent {self.name} failed after {attempt} attempts: {last_exception}"
         ) from last_exception
 
-    async def run(self, brief: ResearchBrief, **kwargs) -> dict:
-        """Execute the agent's research task."""
+    async def run(self, brief: ResearchBrief, no_cache: bool = False, **kwargs) -> dict:
+        """Execute the agent's research task.
+
+        Pass ``no_cache=True`` to bypass the response cache.
+        """
         prompt = self.build_prompt(brief)
-        result = await self._call_api(prompt)
+        result = await self._call_api(
+            prompt, no_cache=no_cache, cache_prefix=self.prompt_prefix(brief.depth)
+        )
         return result
 
 
 class CommunityMapper(SubAgent):
     """Finds where the target audience hangs out online."""
 
-    def __init__(self):
-        super().__init__(
-            name="CommunityMapper",
-            mission="Find WHERE the target audience hangs out online. Identify specific "
-            "communities, platforms, influencers, and gathering places.",
-        )
-
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Community Mapper specific prompt."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        return f"""
-You are CommunityMapper, a specialized research agent.
+    __slots__ = ()
 
-Mission: {self.mission}
-
-{search_instructions}
-
-## Research Brief
-
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Topic:** {brief.offering_what} - {brief.offering_problem}
-**Primary Question:** {brief.primary_question}
-
-## Your Task
-
-Search for platform-specific communities where {brief.target_customer} in {brief.geography} discuss topics related to {brief.offering_what}.
+    brief_fields = (
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Topic", "{offering_what} - {offering_problem}"),
+        ("Primary Question", "{primary_question}"),
+    )
+    task = """\
+Search for platform-specific communities where {target_customer} in {geography} discuss topics related to {offering_what}.
 
 Search:
 - Reddit: subreddits
@@ -407,37 +769,27 @@ For each community found, provide:
 Return structured JSON with your findings. Every claim needs a URL.
 """
 
-
-class VoiceMiner(SubAgent):
-    """Extracts verbatim quotes and language patterns."""
-
     def __init__(self):
         super().__init__(
-            name="VoiceMiner",
-            mission="Extract the authentic voice of the target audience. Find verbatim "
-            "quotes, pain points, desires, objections, and language patterns.",
+            name="CommunityMapper",
+            mission="Find WHERE the target audience hangs out online. Identify specific "
+            "communities, platforms, influencers, and gathering places.",
         )
 
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Voice Miner specific prompt."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        return f"""
-You are VoiceMiner, a specialized research agent.
-
-Mission: {self.mission}
-
-{search_instructions}
 
-## Research Brief
+class VoiceMiner(SubAgent):
+    """Extracts verbatim quotes and language patterns."""
 
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Problem:** {brief.offering_problem}
-**Primary Question:** {brief.primary_question}
+    __slots__ = ()
 
-## Your Task
-
-Find the authentic voice of {brief.target_customer}. Search Reddit, Twitter/X, forums, review sites, and communities for:
+    brief_fields = (
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Problem", "{offering_problem}"),
+        ("Primary Question", "{primary_question}"),
+    )
+    task = """\
+Find the authentic voice of {target_customer}. Search Reddit, Twitter/X, forums, review sites, and communities for:
 
 1. **Pain Points** - What frustrates them? What do they complain about?
 2. **Desires** - What do they wish existed? What would make their life easier?
@@ -462,38 +814,27 @@ Find at least 15-20 real quotes with URLs. Do NOT make up quotes or URLs.
 Return structured JSON with categorized quotes and their source URLs.
 """
 
-
-class PricingIntel(SubAgent):
-    """Researches pricing landscape and willingness-to-pay."""
-
     def __init__(self):
         super().__init__(
-            name="PricingIntel",
-            mission="Research pricing landscape, economic context, and willingness-to-pay "
-            "signals for the target market.",
+            name="VoiceMiner",
+            mission="Extract the authentic voice of the target audience. Find verbatim "
+            "quotes, pain points, desires, objections, and language patterns.",
         )
 
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Pricing Intel specific prompt."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        pricing_model = brief.offering_pricing_model or "Not specified"
-        return f"""
-You are PricingIntel, a specialized research agent.
-
-Mission: {self.mission}
 
-{search_instructions}
-
-## Research Brief
-
-**Offering:** {brief.offering_what}
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Proposed Pricing Model:** {pricing_model}
+class PricingIntel(SubAgent):
+    """Researches pricing landscape and willingness-to-pay."""
 
-## Your Task
+    __slots__ = ()
 
-Research pricing intelligence for {brief.offering_what} targeting {brief.target_customer} in {brief.geography}:
+    brief_fields = (
+        ("Offering", "{offering_what}"),
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Proposed Pricing Model", "{pricing_model}"),
+    )
+    task = """\
+Research pricing intelligence for {offering_what} targeting {target_customer} in {geography}:
 
 1. **Competitor Pricing** - What do similar solutions cost? Tiers? Features per tier?
 2. **Market Rates** - What's the going rate in this category?
@@ -519,39 +860,27 @@ Find real pricing data with URLs. Do NOT estimate or guess prices.
 Return structured JSON with pricing data and source URLs.
 """
 
-
-class CompetitorProfiler(SubAgent):
-    """Deep-dives on competitor offerings and gaps."""
-
     def __init__(self):
         super().__init__(
-            name="CompetitorProfiler",
-            mission="Deep-dive analysis of competitors: their offerings, positioning, "
-            "strengths, weaknesses, and customer sentiment.",
+            name="PricingIntel",
+            mission="Research pricing landscape, economic context, and willingness-to-pay "
+            "signals for the target market.",
         )
 
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Competitor Profiler specific prompt with known competitors."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        competitors_str = ", ".join(brief.known_competitors) if brief.known_competitors else "None specified"
 
-        return f"""
-You are CompetitorProfiler, a specialized research agent.
-
-Mission: {self.mission}
-
-{search_instructions}
-
-## Research Brief
-
-**Offering:** {brief.offering_what}
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Known Competitors:** {competitors_str}
+class CompetitorProfiler(SubAgent):
+    """Deep-dives on competitor offerings and gaps."""
 
-## Your Task
+    __slots__ = ()
 
-Start with the known competitors ({competitors_str}) and discover additional competitors.
+    brief_fields = (
+        ("Offering", "{offering_what}"),
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Known Competitors", "{competitors}"),
+    )
+    task = """\
+Start with the known competitors ({competitors}) and discover additional competitors.
 
 For each competitor, research:
 - Company/person background
@@ -581,36 +910,28 @@ Find at least 5-10 competitors with full source documentation.
 Return structured JSON with competitor profiles and all source URLs.
 """
 
-
-class LocalContext(SubAgent):
-    """Researches geography-specific factors."""
-
     def __init__(self):
         super().__init__(
-            name="LocalContext",
-            mission="Research geography-specific and culture-specific factors that "
-            "impact go-to-market strategy.",
+            name="CompetitorProfiler",
+            mission="Deep-dive analysis of competitors: their offerings, positioning, "
+            "strengths, weaknesses, and customer sentiment.",
         )
 
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Local Context specific prompt."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        return f"""
-You are LocalContext, a specialized research agent.
 
-Mission: {self.mission}
-
-{search_instructions}
-
-## Research Brief
-
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Offering:** {brief.offering_what}
+class LocalContext(SubAgent):
+    """Researches geography-specific factors."""
 
-## Your Task
+    __slots__ = ()
 
-Research geography-specific factors for {brief.geography} that impact go-to-market:
+    # A handful of sourced data points, well under the default budget
+    max_output_tokens = 2048
+    brief_fields = (
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Offering", "{offering_what}"),
+    )
+    task = """\
+Research geography-specific factors for {geography} that impact go-to-market:
 
 1. **Economic Context** - GDP, average income, spending patterns, currency
 2. **Digital Landscape** - Internet penetration, popular platforms, payment methods
@@ -627,7 +948,7 @@ Every insight MUST include:
 3. **Specific statistics** with attribution
 
 Example format:
-- Internet penetration in {brief.geography}: 45%
+- Internet penetration in {geography}: 45%
   - Source: https://datareportal.com/reports/digital-2024-country
   - Published: January 2024
 
@@ -636,37 +957,29 @@ Use authoritative sources: World Bank, IMF, Statista, government statistics, rep
 Return structured JSON with local context data and source URLs.
 """
 
-
-class TrendDetector(SubAgent):
-    """Identifies momentum and timing signals."""
-
     def __init__(self):
         super().__init__(
-            name="TrendDetector",
-            mission="Identify momentum, timing signals, and trend data for the "
-            "research topic.",
+            name="LocalContext",
+            mission="Research geography-specific and culture-specific factors that "
+            "impact go-to-market strategy.",
         )
 
-    def build_prompt(self, brief: ResearchBrief) -> str:
-        """Build Trend Detector specific prompt."""
-        search_instructions = get_vicious_search_instructions(brief.depth, self.name)
-        return f"""
-You are TrendDetector, a specialized research agent.
-
-Mission: {self.mission}
-
-{search_instructions}
-
-## Research Brief
 
-**Offering:** {brief.offering_what}
-**Target Customer:** {brief.target_customer}
-**Geography:** {brief.geography}
-**Problem:** {brief.offering_problem}
+class TrendDetector(SubAgent):
+    """Identifies momentum and timing signals."""
 
-## Your Task
+    __slots__ = ()
 
-Identify trends and timing signals for {brief.offering_what}:
+    # A handful of sourced data points, well under the default budget
+    max_output_tokens = 2048
+    brief_fields = (
+        ("Offering", "{offering_what}"),
+        ("Target Customer", "{target_customer}"),
+        ("Geography", "{geography}"),
+        ("Problem", "{offering_problem}"),
+    )
+    task = """\
+Identify trends and timing signals for {offering_what}:
 
 1. **Search Trends** - Is interest growing, stable, or declining?
 2. **Industry Reports** - What do analysts say about this market?
@@ -694,42 +1007,41 @@ Use: Google Trends, Crunchbase, TechCrunch, industry reports, news sources.
 Return structured JSON with trends and source URLs.
 """
 
-
-class OpportunitySynthesizer(SubAgent):
-    """Synthesizes all findings into final report."""
-
     def __init__(self):
         super().__init__(
-            name="OpportunitySynthesizer",
-            mission="Synthesize findings from all sub-agents into a comprehensive, "
-            "professional-grade market research report.",
+            name="TrendDetector",
+            mission="Identify momentum, timing signals, and trend data for the "
+            "research topic.",
         )
 
-    async def run(self, brief: ResearchBrief, **kwargs) -> dict:
-        """Execute synthesis with findings from other agents."""
-        findings = kwargs.get("findings", {})
-        prompt = self.build_synthesis_prompt(brief, findings)
-        result = await self._call_api(prompt)
-        return result
 
-    def build_synthesis_prompt(self, brief: ResearchBrief, findings: dict) -> str:
-        """Build the synthesis prompt with all findings."""
-        findings_text = []
-        for agent_name, data in findings.items():
-            findings_text.append(f"### {agent_name}\n{data}")
+def _format_findings(data) -> str:
+    """Render one agent's findings for the synthesis prompt.
 
-        return f"""
+    Plain-text responses are embedded as-is and structured findings as
+    compact JSON, rather than a Python ``repr`` of the parsed dict.
+    """
+    if isinstance(data, dict):
+        if data.keys() == {"response"} and isinstance(data["response"], str):
+            return data["response"]
+        return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return str(data)
+
+
+# Synthesis prompt around the findings section
+_SYNTHESIS_PROMPT_HEAD = """
 You are OpportunitySynthesizer, the final research agent.
 
-Mission: {self.mission}
+Mission: {mission}
 
 ## Research Brief
 
-{brief.to_markdown()}
+{brief_markdown}
 
 ## Findings from Other Agents
 
-{chr(10).join(findings_text)}
+"""
+_SYNTHESIS_PROMPT_TAIL = """
 
 ## Your Task
 
@@ -762,14 +1074,68 @@ Example formatting:
 **DO NOT make claims without sources from the findings above.**
 **DO NOT invent URLs or statistics.**
 
-Focus especially on the primary question: {brief.primary_question}
+Focus especially on the primary question: {primary_question}
 
 Return the complete report in markdown format with full citations.
 """
 
 
+class OpportunitySynthesizer(SubAgent):
+    """Synthesizes all findings into final report."""
+
+    __slots__ = ()
+
+    # The report is returned as markdown text, not tool JSON
+    json_output = False
+    # The full report is the longest output of the pipeline
+    max_output_tokens = 8192
+    stream_output = True
+
+    def __init__(self):
+        super().__init__(
+            name="OpportunitySynthesizer",
+            mission="Synthesize findings from all sub-agents into a comprehensive, "
+            "professional-grade market research report.",
+        )
+
+    async def run(self, brief: ResearchBrief, no_cache: bool = False, **kwargs) -> dict:
+        """Execute synthesis with findings from other agents.
+
+        Pass ``on_text`` to receive report text as it streams in.
+        """
+        findings = kwargs.get("findings", {})
+        prompt = self.build_synthesis_prompt(brief, findings)
+        result = await self._call_api(prompt, no_cache=no_cache, on_text=kwargs.get("on_text"))
+        return result
+
+    def build_synthesis_prompt(self, brief: ResearchBrief, findings: dict) -> str:
+        """Build the synthesis prompt with all findings.
+
+        Findings can run to hundreds of KB, so the prompt is assembled with a
+        single ``str.join`` instead of nested f-strings that copy them twice.
+        """
+        parts = [_SYNTHESIS_PROMPT_HEAD.format(mission=self.mission, brief_markdown=brief.markdown)]
+        for index, (agent_name, data) in enumerate(findings.items()):
+            if index:
+                parts.append("\n")
+            parts += ("### ", agent_name, "\n", _format_findings(data))
+        parts.append(_SYNTHESIS_PROMPT_TAIL.format(primary_question=brief.primary_question))
+        return "".join(parts)
+
+
 class SourceVerifier(SubAgent):
-    """Verifies sources and flags unsupported claims."""
+    """Verifies sources and flags unsupported claims.
+
+    URLs are extracted and checked over HTTP locally (see
+    ``src.source_checker``); the API is only asked for unsupported claims.
+    """
+
+    __slots__ = ()
+
+    # Only the unsupported-claims list comes back from the API; run() builds
+    # the score and source list from the HTTP check
+    max_output_tokens = 2048
+    findings_keys = ("unsupported_claims",)
 
     def __init__(self):
         super().__init__(
@@ -778,16 +1144,46 @@ class SourceVerifier(SubAgent):
             "URLs are accessible and sources support the claims made.",
         )
 
-    async def run(self, brief: ResearchBrief, **kwargs) -> dict:
-        """Execute verification on the synthesized report."""
+    async def run(self, brief: ResearchBrief, no_cache: bool = False, **kwargs) -> dict:
+        """Execute verification on the synthesized report.
+
+        The HTTP source check and the unsupported-claims API call run
+        concurrently; the verification result is assembled locally.
+        """
+        from src.source_checker import verify_report_sources
+
         report = kwargs.get("report", {})
+        report_text = _report_text(report)
         prompt = self.build_verification_prompt(brief, report)
-        result = await self._call_api(prompt)
-        return result
+        source_check, claims = await asyncio.gather(
+            verify_report_sources(report_text),
+            self._call_api(prompt, no_cache=no_cache),
+        )
+
+        sources = [
+            {
+                "url": checked["url"],
+                "status": "VERIFIED" if checked["status"] == "alive" else "QUESTIONABLE",
+                "notes": _source_notes(checked),
+            }
+            for checked in source_check["results"]
+        ]
+        total = source_check["total_urls"]
+        unsupported = claims.get("unsupported_claims", [])
+        if not isinstance(unsupported, list):
+            unsupported = [unsupported]
+        return {
+            "verification_score": round(100 * source_check["alive"] / total) if total else 0,
+            "total_sources_found": total,
+            "sources": sources,
+            "unsupported_claims": unsupported,
+            "source_check": source_check,
+            "_token_usage": claims.get("_token_usage", {}),
+        }
 
     def build_verification_prompt(self, brief: ResearchBrief, report: dict) -> str:
-        """Build the verification prompt."""
-        report_text = report.get("response", report.get("report", str(report)))
+        """Build the unsupported-claims prompt."""
+        report_text = _report_text(report)
 
         return f"""
 You are SourceVerifier, a specialized verification agent.
@@ -800,40 +1196,48 @@ Mission: {self.mission}
 
 ## Your Task
 
-Review the report above and verify its sources:
-
-1. **Extract all URLs** mentioned in the report
-2. **Categorize each source**:
-   - VERIFIED: URL format is valid and claim matches likely source content
-   - QUESTIONABLE: URL format looks suspicious or claim seems unsupported
-   - MISSING: Important claims without any source citation
-
-3. **Flag unsupported claims** - Any statistics, quotes, or facts without sources
-
-4. **Provide a verification score** (0-100) based on:
-   - Percentage of claims with sources
-   - Quality and diversity of sources
-   - Specificity of citations
+Every URL in the report is checked separately over HTTP. Your only job is to
+flag **unsupported claims**: statistics, quotes, or facts in the report above
+that have no source citation.
 
 ## Output Format
 
 Return JSON with:
 {{
-  "verification_score": 85,
-  "total_sources_found": 25,
-  "sources": [
-    {{
-      "url": "https://example.com/...",
-      "claim": "The claim this supports",
-      "status": "VERIFIED|QUESTIONABLE|MISSING",
-      "notes": "Any concerns or validation notes"
-    }}
-  ],
   "unsupported_claims": [
-    "List of claims that need sources"
-  ],
-  "recommendations": [
-    "Suggestions for improving source quality"
+    "Each claim that needs a source"
   ]
 }}
 """
+
+
+def _report_text(report: dict) -> str:
+    """Return the markdown body of a synthesizer result."""
+    return report.get("response", report.get("report", str(report)))
+
+
+def _source_notes(checked: dict) -> str:
+    """Summarize an HTTP source check result for the verification output."""
+    if checked["status"] == "alive":
+        if checked.get("redirect_url"):
+            return f"Reachable (redirects to {checked['redirect_url']})"
+        return f"Reachable (HTTP {checked['status_code']})"
+    if checked.get("status_code"):
+        return f"{checked['status']} (HTTP {checked['status_code']})"
+    return f"{checked['status']}: {checked.get('error') or 'no response'}"
+
+
+# Every agent class by name, in pipeline order
+AGENT_CLASSES: dict[str, type[SubAgent]] = {
+    agent_cls.__name__: agent_cls
+    for agent_cls in (
+        CommunityMapper,
+        LocalContext,
+        VoiceMiner,
+        PricingIntel,
+        CompetitorProfiler,
+        TrendDetector,
+        OpportunitySynthesizer,
+        SourceVerifier,
+    )
+}
@@ -1,173 +1,204 @@
 """Export utilities for research reports."""
 
+import copy
+import functools
 import io
-import json
 import logging
 import re
 import zipfile
+from collections.abc import Collection
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional
+from typing import BinaryIO, Optional
+from xml.sax.saxutils import escape
 
-import markdown2
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.shared import Pt
+import orjson
+
+# markdown2 and python-docx are imported where they are used, like weasyprint,
+# so importing this module stays cheap for processes that never export.
 
 logger = logging.getLogger(__name__)
 
 
-def markdown_to_html(markdown_content: str) -> str:
-    """Convert markdown to HTML with styling."""
-    html_content = markdown2.markdown(
-        markdown_content,
-        extras=[
-            "fenced-code-blocks",
-            "tables",
-            "header-ids",
-            "strike",
-            "task_list",
-        ],
-    )
-
-    # Wrap in styled HTML document
-    styled_html = f"""
+# Styled document shell around the rendered markdown, built once at import.
+# The PDF variant drops the Google Fonts @import so WeasyPrint does not fetch
+# it over the network on every render; it falls back to the system fonts.
+_HTML_HEAD = """
 <!DOCTYPE html>
 <html>
 <head>
     <meta charset="utf-8">
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
+"""
+_FONT_IMPORT = """        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 
-        body {{
+"""
+_HTML_STYLES = """        body {
             font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
             line-height: 1.6;
             color: #1a1a2e;
             max-width: 800px;
             margin: 0 auto;
             padding: 40px 20px;
-        }}
+        }
 
-        h1 {{
+        h1 {
             color: #007A75;
             border-bottom: 3px solid #007A75;
             padding-bottom: 10px;
             font-size: 28px;
-        }}
+        }
 
-        h2 {{
+        h2 {
             color: #1a1a2e;
             border-bottom: 1px solid #e0e0e0;
             padding-bottom: 8px;
             margin-top: 30px;
             font-size: 22px;
-        }}
+        }
 
-        h3 {{
+        h3 {
             color: #333;
             margin-top: 25px;
             font-size: 18px;
-        }}
+        }
 
-        table {{
+        table {
             border-collapse: collapse;
             width: 100%;
             margin: 20px 0;
-        }}
+        }
 
-        th, td {{
+        th, td {
             border: 1px solid #ddd;
             padding: 12px;
             text-align: left;
-        }}
+        }
 
-        th {{
+        th {
             background-color: #007A75;
             color: white;
-        }}
+        }
 
-        tr:nth-child(even) {{
+        tr:nth-child(even) {
             background-color: #f9f9f9;
-        }}
+        }
 
-        blockquote {{
+        blockquote {
             border-left: 4px solid #007A75;
             margin: 20px 0;
             padding: 10px 20px;
             background-color: #f8fafa;
             font-style: italic;
-        }}
+        }
 
-        code {{
+        code {
             background-color: #f4f4f4;
             padding: 2px 6px;
             border-radius: 3px;
             font-family: 'Fira Code', monospace;
-        }}
+        }
 
-        pre {{
+        pre {
             background-color: #f4f4f4;
             padding: 15px;
             border-radius: 5px;
             overflow-x: auto;
-        }}
+        }
 
-        a {{
+        a {
             color: #007A75;
             text-decoration: none;
-        }}
+        }
 
-        a:hover {{
+        a:hover {
             text-decoration: underline;
-        }}
+        }
 
-        ul, ol {{
+        ul, ol {
             margin: 15px 0;
             padding-left: 30px;
-        }}
+        }
 
-        li {{
+        li {
             margin: 8px 0;
-        }}
+        }
 
-        .source-citation {{
+        .source-citation {
             font-size: 0.9em;
             color: #666;
-        }}
+        }
 
-        @media print {{
-            body {{
+        @media print {
+            body {
                 max-width: none;
                 padding: 20px;
-            }}
+            }
 
-            h1, h2, h3 {{
+            h1, h2, h3 {
                 page-break-after: avoid;
-            }}
+            }
 
-            table, blockquote {{
+            table, blockquote {
                 page-break-inside: avoid;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
-{html_content}
+"""
+_HTML_PREFIX = _HTML_HEAD + _FONT_IMPORT + _HTML_STYLES
+_PDF_HTML_PREFIX = _HTML_HEAD + _HTML_STYLES
+_HTML_SUFFIX = """
 </body>
 </html>
 """
-    return styled_html
+
+
+@functools.lru_cache(maxsize=4)
+def _render_markdown(markdown_content: str) -> str:
+    """Render markdown to an HTML fragment.
+
+    Cached because one report is rendered for both the HTML and PDF exports,
+    in the bundle and in the individual downloads.
+    """
+    import markdown2
+
+    return markdown2.markdown(
+        markdown_content,
+        extras=[
+            "fenced-code-blocks",
+            "tables",
+            "header-ids",
+            "strike",
+            "task_list",
+        ],
+    )
+
+
+def markdown_to_html(markdown_content: str) -> str:
+    """Convert markdown to HTML with styling."""
+    return _HTML_PREFIX + _render_markdown(markdown_content) + _HTML_SUFFIX
+
+
+@functools.lru_cache(maxsize=4)
+def _render_pdf(markdown_content: str) -> bytes:
+    """Render markdown to PDF bytes.
+
+    Cached because the results page re-exports the same report on every
+    Streamlit rerun.
+    """
+    from weasyprint import HTML
+
+    html_content = _PDF_HTML_PREFIX + _render_markdown(markdown_content) + _HTML_SUFFIX
+    return HTML(string=html_content).write_pdf()
 
 
 def export_to_pdf(markdown_content: str, title: str = "Research Report") -> bytes:
     """Export markdown content to PDF bytes."""
     logger.info("Generating PDF: title=%s, content_length=%d", title, len(markdown_content))
     try:
-        from weasyprint import HTML
-
-        html_content = markdown_to_html(markdown_content)
-        pdf_bytes = HTML(string=html_content).write_pdf()
+        pdf_bytes = _render_pdf(markdown_content)
         logger.info("PDF generated successfully: %d bytes", len(pdf_bytes))
         return pdf_bytes
     except ImportError:
@@ -181,52 +212,75 @@ def export_to_pdf(markdown_content: str, title: str = "Research Report") -> byte
         raise RuntimeError(f"PDF generation failed: {e}")
 
 
+# A blue, underlined hyperlink run, parsed in one go instead of assembled from
+# six separately created elements
+_HYPERLINK_XML = (
+    '<w:hyperlink'
+    ' xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    ' r:id="{r_id}"><w:r><w:rPr><w:color w:val="0563C1"/><w:u w:val="single"/>'
+    '</w:rPr><w:t xml:space="preserve">{text}</w:t></w:r></w:hyperlink>'
+)
+# Escape carriage returns too, which an XML parser would otherwise normalize
+_XML_TEXT_ENTITIES = {"\r": "&#13;"}
+
+
 def _add_hyperlink(paragraph, text, url):
     """Add a hyperlink run to a paragraph.
 
     Creates a proper OOXML hyperlink element so the link is clickable in Word.
     """
+    from docx.oxml import parse_xml
+
     part = paragraph.part
     r_id = part.relate_to(
         url,
         "http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink",
         is_external=True,
     )
-
-    hyperlink = OxmlElement("w:hyperlink")
-    hyperlink.set(qn("r:id"), r_id)
-
-    new_run = OxmlElement("w:r")
-    rPr = OxmlElement("w:rPr")
-
-    # Blue color
-    color = OxmlElement("w:color")
-    color.set(qn("w:val"), "0563C1")
-    rPr.append(color)
-
-    # Underline
-    u = OxmlElement("w:u")
-    u.set(qn("w:val"), "single")
-    rPr.append(u)
-
-    new_run.append(rPr)
-    run_text = OxmlElement("w:t")
-    run_text.text = text
-    # Preserve leading/trailing spaces
-    run_text.set(qn("xml:space"), "preserve")
-    new_run.append(run_text)
-    hyperlink.append(new_run)
-
+    hyperlink = parse_xml(
+        _HYPERLINK_XML.format(r_id=r_id, text=escape(text, _XML_TEXT_ENTITIES))
+    )
     paragraph._p.append(hyperlink)
 
 
-# Pattern for inline markdown: bold, italic, and links.
-# Order matters — check bold before italic since ** contains *.
-_INLINE_RE = re.compile(
-    r"(\*\*(.+?)\*\*)"         # bold **text**
-    r"|(\*(.+?)\*)"            # italic *text*
-    r"|(\[([^\]]+)\]\(([^)]+)\))"  # link [text](url)
-)
+def _iter_inline_tokens(text: str):
+    """Yield ``(start, end, kind, inner, url)`` for each inline markdown token.
+
+    *kind* is ``"bold"`` (``**text**``), ``"italic"`` (``*text*``) or
+    ``"link"`` (``[text](url)``). A single left-to-right pass jumps between
+    ``*`` and ``[`` with ``str.find``; at each one bold is tried before italic
+    since ``**`` contains ``*``. Emphasis does not span newlines.
+    """
+    pos = 0
+    while True:
+        star = text.find("*", pos)
+        bracket = text.find("[", pos)
+        if star == -1 and bracket == -1:
+            return
+        pos = bracket if star == -1 else star if bracket == -1 else min(star, bracket)
+
+        if text[pos] == "*":
+            if text.startswith("**", pos):
+                close = text.find("**", pos + 3)
+                if close != -1 and "\n" not in text[pos + 2:close]:
+                    yield pos, close + 2, "bold", text[pos + 2:close], None
+                    pos = close + 2
+                    continue
+            close = text.find("*", pos + 2)
+            if close != -1 and "\n" not in text[pos + 1:close]:
+                yield pos, close + 1, "italic", text[pos + 1:close], None
+                pos = close + 1
+                continue
+        else:
+            close = text.find("]", pos + 1)
+            if close > pos + 1 and text.startswith("(", close + 1):
+                end = text.find(")", close + 2)
+                if end > close + 2:
+                    yield pos, end + 1, "link", text[pos + 1:close], text[close + 2:end]
+                    pos = end + 1
+                    continue
+        pos += 1
 
 
 def _add_formatted_runs(paragraph, text):
@@ -236,27 +290,28 @@ def _add_formatted_runs(paragraph, text):
     ``*italic*`` becomes an italic run, and ``[text](url)`` becomes a
     clickable hyperlink.
     """
+    # Every inline token starts with "*" or "[", so most prose skips the scan
+    if "*" not in text and "[" not in text:
+        if text:
+            paragraph.add_run(text)
+        return
+
     last_end = 0
-    for m in _INLINE_RE.finditer(text):
-        # Add any plain text before this match
-        if m.start() > last_end:
-            paragraph.add_run(text[last_end:m.start()])
-
-        if m.group(2) is not None:
-            # Bold
-            run = paragraph.add_run(m.group(2))
+    for start, end, kind, inner, url in _iter_inline_tokens(text):
+        # Add any plain text before this token
+        if start > last_end:
+            paragraph.add_run(text[last_end:start])
+
+        if kind == "bold":
+            run = paragraph.add_run(inner)
             run.bold = True
-        elif m.group(4) is not None:
-            # Italic
-            run = paragraph.add_run(m.group(4))
+        elif kind == "italic":
+            run = paragraph.add_run(inner)
             run.italic = True
-        elif m.group(6) is not None:
-            # Link
-            link_text = m.group(6)
-            link_url = m.group(7)
-            _add_hyperlink(paragraph, link_text, link_url)
+        else:
+            _add_hyperlink(paragraph, inner, url)
 
-        last_end = m.end()
+        last_end = end
 
     # Trailing plain text
     if last_end < len(text):
@@ -266,9 +321,8 @@ def _add_formatted_runs(paragraph, text):
 def _is_table_separator(line: str) -> bool:
     """Return True if *line* is a markdown table separator row (e.g. |---|---|)."""
     stripped = line.strip().strip("|").strip()
-    return bool(stripped) and all(
-        c in "-: " for c in stripped.replace("|", "")
-    )
+    # Only "-", ":" and spaces remain once the inner pipes are dropped
+    return bool(stripped) and not stripped.replace("|", "").strip("-: ")
 
 
 def _parse_table_row(line: str) -> list[str]:
@@ -277,213 +331,362 @@ def _parse_table_row(line: str) -> list[str]:
     return [c.strip() for c in cells]
 
 
+class _LineReader:
+    """Iterate the lines of a markdown document with one line of lookahead.
+
+    Lines are split on "\n" only (like ``str.split("\n")``) and streamed
+    from the text instead of materialized as a list up front.
+    """
+
+    __slots__ = ("_lines", "_peeked")
+
+    def __init__(self, text: str):
+        self._lines = io.StringIO(text, newline="\n")
+        self._peeked: Optional[str] = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if self._peeked is not None:
+            line, self._peeked = self._peeked, None
+            return line
+        line = self._lines.readline()
+        if not line:
+            raise StopIteration
+        return line[:-1] if line.endswith("\n") else line
+
+    def peek(self) -> Optional[str]:
+        """Return the next line without consuming it, or None at the end."""
+        if self._peeked is None:
+            self._peeked = next(self, None)
+        return self._peeked
+
+
+def _add_code_block(doc, line: str, lines: _LineReader) -> None:
+    """Add the fenced code block opened by *line*, consuming its closing fence."""
+    code_content = []
+    for code_line in lines:
+        if code_line.startswith("```"):
+            break
+        code_content.append(code_line)
+    else:
+        # An unterminated fence swallows the rest of the document
+        return
+
+    from docx.shared import Pt
+
+    code_para = doc.add_paragraph("\n".join(code_content))
+    code_para.style = "No Spacing"
+    for run in code_para.runs:
+        run.font.name = "Courier New"
+        run.font.size = Pt(9)
+
+
+def _add_table(doc, line: str, lines: _LineReader) -> None:
+    """Add the table whose header row is *line*, consuming its remaining rows."""
+    header_cells = _parse_table_row(line)
+    next(lines)  # skip separator row
+
+    # Collect data rows
+    data_rows: list[list[str]] = []
+    while True:
+        row = lines.peek()
+        if row is None or "|" not in row or _is_table_separator(row):
+            break
+        data_rows.append(_parse_table_row(next(lines)))
+
+    num_cols = len(header_cells)
+    table = doc.add_table(rows=1 + len(data_rows), cols=num_cols)
+    table.style = "Table Grid"
+
+    # Resolve each row's cells once: python-docx rebuilds the cell list from
+    # the grid on every row.cells access. New cells already hold one empty
+    # paragraph, so runs go straight into it. Extra cells beyond the header
+    # width are dropped by zip().
+    rows = list(table.rows)
+
+    # Header row
+    for cell, cell_text in zip(rows[0].cells, header_cells):
+        run = cell.paragraphs[0].add_run(cell_text)
+        run.bold = True
+
+    # Data rows; the same plain-text check as _add_formatted_runs, inlined
+    # since most cells are plain
+    for row, row_cells in zip(rows[1:], data_rows):
+        for cell, cell_text in zip(row.cells, row_cells):
+            if "*" in cell_text or "[" in cell_text:
+                _add_formatted_runs(cell.paragraphs[0], cell_text)
+            elif cell_text:
+                cell.paragraphs[0].add_run(cell_text)
+
+    logger.debug("Added table: %d cols, %d data rows", num_cols, len(data_rows))
+
+
+def _add_block(doc, line: str, lines: _LineReader) -> None:
+    """Add the block starting at *line* (tables, lists, rules, paragraphs)."""
+    # ----- Markdown table detection -----
+    # A table starts with a pipe-delimited row followed by a separator row.
+    if "|" in line:
+        next_line = lines.peek()
+        if next_line is not None and _is_table_separator(next_line):
+            _add_table(doc, line, lines)
+            return
+
+    # Handle nested bullet points (indented with 2+ spaces or 1+ tabs)
+    indent_char = line[:1]
+    if indent_char == " " or indent_char == "\t":
+        text = line.lstrip(indent_char)
+        indent_level = len(line) - len(text)
+        if text[:2] in ("- ", "* ") and (indent_level >= 2 or indent_char == "\t"):
+            # 2-3 spaces or 1 tab = level 2, 4+ spaces or 2+ tabs = level 3
+            if indent_level >= 4:
+                style = "List Bullet 3"
+            else:
+                style = "List Bullet 2"
+            para = doc.add_paragraph(style=style)
+            _add_formatted_runs(para, text[2:])
+            return
+
+    # Handle bullet points (top-level)
+    if line.startswith("- ") or line.startswith("* "):
+        para = doc.add_paragraph(style="List Bullet")
+        _add_formatted_runs(para, line[2:])
+    # Handle numbered lists
+    elif line and line[0].isdigit() and ". " in line[:4]:
+        text = line.split(". ", 1)[1] if ". " in line else line
+        para = doc.add_paragraph(style="List Number")
+        _add_formatted_runs(para, text)
+    # Handle horizontal rules
+    elif line.startswith("---"):
+        doc.add_paragraph("─" * 50)
+    # Handle regular paragraphs
+    elif line.strip():
+        para = doc.add_paragraph()
+        _add_formatted_runs(para, line)
+
+
+def _add_fence_or_block(doc, line: str, lines: _LineReader) -> None:
+    """Dispatch target for lines starting with a backtick."""
+    if line.startswith("```"):
+        _add_code_block(doc, line, lines)
+    else:
+        _add_block(doc, line, lines)
+
+
+def _add_heading_or_block(doc, line: str, lines: _LineReader) -> None:
+    """Dispatch target for lines starting with '#'."""
+    # "# " to "#### " are headings; the run of '#' gives the level
+    text = line.lstrip("#")
+    level = len(line) - len(text)
+    if level <= 4 and text.startswith(" "):
+        doc.add_heading(text[1:], level)
+    else:
+        _add_block(doc, line, lines)
+
+
+def _add_quote_or_block(doc, line: str, lines: _LineReader) -> None:
+    """Dispatch target for lines starting with '>'."""
+    if not line.startswith("> "):
+        _add_block(doc, line, lines)
+        return
+    quote_para = doc.add_paragraph()
+    quote_para.style = "Quote"
+    _add_formatted_runs(quote_para, line[2:])
+
+
+# Block handler by a line's first character. Code fences, headings and quotes
+# take precedence over everything else; all other lines go to _add_block.
+_BLOCK_HANDLERS = {
+    "`": _add_fence_or_block,
+    "#": _add_heading_or_block,
+    ">": _add_quote_or_block,
+}
+
+
+@functools.lru_cache(maxsize=1)
+def _docx_template():
+    """The blank python-docx document, loaded from the package template once.
+
+    Never modified; export_to_docx works on deep copies of it.
+    """
+    from docx import Document
+
+    return Document()
+
+
 def export_to_docx(markdown_content: str, title: str = "Research Report") -> bytes:
-    """Export markdown content to DOCX bytes."""
+    """Export markdown content to DOCX bytes.
+
+    Exports are cached per report, title and day (the document shows its
+    generation date), so re-downloads on each rerun reuse the first one.
+    """
+    return _export_docx(markdown_content, title, datetime.now().strftime("%B %d, %Y"))
+
+
+@functools.lru_cache(maxsize=4)
+def _export_docx(markdown_content: str, title: str, generated: str) -> bytes:
+    """Build the DOCX bytes for export_to_docx."""
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+
     logger.info("Generating DOCX: title=%s, content_length=%d", title, len(markdown_content))
-    doc = Document()
+    # Copying the parsed template is ~3x cheaper than re-reading it from disk
+    doc = copy.deepcopy(_docx_template())
 
     # Add title
     title_para = doc.add_heading(title, 0)
     title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     # Add generation date
-    date_para = doc.add_paragraph(f"Generated: {datetime.now().strftime('%B %d, %Y')}")
+    date_para = doc.add_paragraph(f"Generated: {generated}")
     date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     doc.add_paragraph()  # Spacer
 
-    # Parse markdown and add content
-    lines = markdown_content.split("\n")
-    in_code_block = False
-    code_content = []
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-
-        # Handle code blocks
-        if line.startswith("```"):
-            if in_code_block:
-                # End code block
-                code_text = "\n".join(code_content)
-                code_para = doc.add_paragraph(code_text)
-                code_para.style = "No Spacing"
-                for run in code_para.runs:
-                    run.font.name = "Courier New"
-                    run.font.size = Pt(9)
-                code_content = []
-                in_code_block = False
-            else:
-                in_code_block = True
-            i += 1
-            continue
-
-        if in_code_block:
-            code_content.append(line)
-            i += 1
-            continue
-
-        # Handle headings
-        if line.startswith("# "):
-            doc.add_heading(line[2:], 1)
-        elif line.startswith("## "):
-            doc.add_heading(line[3:], 2)
-        elif line.startswith("### "):
-            doc.add_heading(line[4:], 3)
-        elif line.startswith("#### "):
-            doc.add_heading(line[5:], 4)
-        # Handle blockquotes
-        elif line.startswith("> "):
-            quote_para = doc.add_paragraph()
-            quote_para.style = "Quote"
-            _add_formatted_runs(quote_para, line[2:])
-
-        # ----- Markdown table detection -----
-        # A table starts with a pipe-delimited row followed by a separator row.
-        elif "|" in line and (i + 1 < len(lines)) and _is_table_separator(lines[i + 1]):
-            header_cells = _parse_table_row(line)
-            i += 1  # skip separator row
-
-            # Collect data rows
-            data_rows: list[list[str]] = []
-            while i + 1 < len(lines) and "|" in lines[i + 1] and not _is_table_separator(lines[i + 1]):
-                i += 1
-                data_rows.append(_parse_table_row(lines[i]))
-
-            num_cols = len(header_cells)
-            table = doc.add_table(rows=1 + len(data_rows), cols=num_cols)
-            table.style = "Table Grid"
-
-            # Header row
-            for col_idx, cell_text in enumerate(header_cells):
-                if col_idx < num_cols:
-                    cell = table.rows[0].cells[col_idx]
-                    cell.text = ""
-                    para = cell.paragraphs[0]
-                    run = para.add_run(cell_text)
-                    run.bold = True
-
-            # Data rows
-            for row_idx, row_cells in enumerate(data_rows, start=1):
-                for col_idx, cell_text in enumerate(row_cells):
-                    if col_idx < num_cols and row_idx < len(table.rows):
-                        cell = table.rows[row_idx].cells[col_idx]
-                        cell.text = ""
-                        _add_formatted_runs(cell.paragraphs[0], cell_text)
-
-            logger.debug("Added table: %d cols, %d data rows", num_cols, len(data_rows))
-
-        # Handle nested bullet points (indented with 2+ spaces)
-        elif re.match(r"^( {2,}|\t+)[-*] ", line):
-            indent_match = re.match(r"^(\s+)[-*] (.*)", line)
-            if indent_match:
-                text = indent_match.group(2)
-                indent_level = len(indent_match.group(1))
-                # 2-3 spaces or 1 tab = level 2, 4+ spaces or 2+ tabs = level 3
-                if indent_level >= 4:
-                    style = "List Bullet 3"
-                else:
-                    style = "List Bullet 2"
-                para = doc.add_paragraph(style=style)
-                _add_formatted_runs(para, text)
-
-        # Handle bullet points (top-level)
-        elif line.startswith("- ") or line.startswith("* "):
-            para = doc.add_paragraph(style="List Bullet")
-            _add_formatted_runs(para, line[2:])
-        # Handle numbered lists
-        elif line and line[0].isdigit() and ". " in line[:4]:
-            text = line.split(". ", 1)[1] if ". " in line else line
-            para = doc.add_paragraph(style="List Number")
-            _add_formatted_runs(para, text)
-        # Handle horizontal rules
-        elif line.startswith("---"):
-            doc.add_paragraph("─" * 50)
-        # Handle regular paragraphs
-        elif line.strip():
-            para = doc.add_paragraph()
-            _add_formatted_runs(para, line)
-
-        i += 1
+    # Parse markdown and add content; handlers consume any extra lines they need
+    lines = _LineReader(markdown_content)
+    for line in lines:
+        handler = _BLOCK_HANDLERS.get(line[:1], _add_block)
+        handler(doc, line, lines)
 
     # Save to bytes
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
     docx_bytes = buffer.getvalue()
     logger.info("DOCX generated successfully: %d bytes", len(docx_bytes))
     return docx_bytes
 
 
+def clear_export_caches() -> None:
+    """Drop all cached renders and exports."""
+    _render_markdown.cache_clear()
+    _render_pdf.cache_clear()
+    _export_docx.cache_clear()
+
+
+def _dump_json(data) -> bytes:
+    """Serialize bundle JSON (indented, UTF-8) with orjson."""
+    return orjson.dumps(
+        data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _render_pool() -> ThreadPoolExecutor:
+    """The worker pool bundle renders run on, started once and reused.
+
+    Threads rather than processes, so renders share the per-report caches
+    above and reports are not pickled across to workers.
+    """
+    return ThreadPoolExecutor(max_workers=3, thread_name_prefix="bundle-render")
+
+
+# Report formats create_asset_bundle can include, in archive order
+BUNDLE_FORMATS = ("md", "html", "pdf", "docx")
+
+# PDF and DOCX are already compressed internally, so they are stored as-is
+_STORED_FORMATS = frozenset({"pdf", "docx"})
+
+
 def create_asset_bundle(
     report_markdown: str,
     raw_findings: Optional[dict] = None,
     title: str = "research_report",
-) -> bytes:
-    """Create a ZIP bundle with all research assets."""
-    logger.info("Creating asset bundle: title=%s", title)
-    buffer = io.BytesIO()
+    sink: Optional[BinaryIO] = None,
+    formats: Collection[str] = BUNDLE_FORMATS,
+) -> Optional[bytes]:
+    """Create a ZIP bundle with all research assets.
+
+    *formats* selects which report renditions to include (see
+    ``BUNDLE_FORMATS``); formats left out are never rendered. The HTML, PDF
+    and DOCX renderers are independent, so they run concurrently in worker
+    threads; the archive itself is written from this thread only.
+
+    If *sink* is given the archive is written straight into it (e.g. an open
+    file or response stream) and None is returned; otherwise the bytes are.
+    """
+    unknown = set(formats) - set(BUNDLE_FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown bundle formats: {sorted(unknown)}")
+
+    logger.info("Creating asset bundle: title=%s, formats=%s", title, sorted(formats))
+    buffer = io.BytesIO() if sink is None else sink
+
+    if "html" in formats or "pdf" in formats:
+        # Render the markdown once up front; the HTML and PDF workers share it
+        _render_markdown(report_markdown)
+
+    pool = _render_pool()
+    renderers = {
+        "html": lambda: markdown_to_html(report_markdown),
+        "pdf": lambda: export_to_pdf(report_markdown, title),
+        "docx": lambda: export_to_docx(report_markdown, title),
+    }
+    futures = {
+        fmt: pool.submit(render) for fmt, render in renderers.items() if fmt in formats
+    }
+
+    # Serialize raw findings while the renderers run
+    raw_files = []
+    if raw_findings:
+        for agent_name, findings in raw_findings.items():
+            if isinstance(findings, dict):
+                raw_files.append((f"raw_data/{agent_name}.json", _dump_json(findings)))
+            else:
+                raw_files.append((f"raw_data/{agent_name}.txt", str(findings)))
 
-    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+    files_included = []
+    # Level 1: a few percent larger than the default level 6 for report
+    # text, at roughly half the compression time
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
         # Add the main report as markdown
-        zf.writestr(f"{title}.md", report_markdown)
-
-        # Add HTML version
-        html_content = markdown_to_html(report_markdown)
-        zf.writestr(f"{title}.html", html_content)
-
-        # Try to add PDF version
-        try:
-            pdf_bytes = export_to_pdf(report_markdown, title)
-            zf.writestr(f"{title}.pdf", pdf_bytes)
-        except Exception as e:
-            logger.warning("PDF generation failed, skipping: %s", e)
-
-        # Add DOCX version
-        try:
-            docx_bytes = export_to_docx(report_markdown, title)
-            zf.writestr(f"{title}.docx", docx_bytes)
-        except Exception as e:
-            logger.warning("DOCX generation failed, skipping: %s", e)
-
-        # Add raw findings if provided
-        if raw_findings:
-            # Create raw_data directory in zip
-            for agent_name, findings in raw_findings.items():
-                if isinstance(findings, dict):
-                    content = json.dumps(findings, indent=2, default=str)
-                    zf.writestr(f"raw_data/{agent_name}.json", content)
-                else:
-                    zf.writestr(f"raw_data/{agent_name}.txt", str(findings))
-
-        # Add metadata
+        if "md" in formats:
+            zf.writestr(f"{title}.md", report_markdown)
+            files_included.append(f"{title}.md")
+
+        # Add the rendered versions, skipping any that failed
+        for fmt, future in futures.items():
+            try:
+                compress_type = (
+                    zipfile.ZIP_STORED if fmt in _STORED_FORMATS else zipfile.ZIP_DEFLATED
+                )
+                zf.writestr(f"{title}.{fmt}", future.result(), compress_type=compress_type)
+                files_included.append(f"{title}.{fmt}")
+            except Exception as e:
+                logger.warning("%s generation failed, skipping: %s", fmt.upper(), e)
+
+        # Add raw findings if provided, under a raw_data directory
+        for name, content in raw_files:
+            zf.writestr(name, content)
+
+        # Add metadata, listing only the renditions actually written
         metadata = {
             "generated_at": datetime.now().isoformat(),
             "title": title,
-            "files_included": [
-                f"{title}.md",
-                f"{title}.html",
-                f"{title}.pdf",
-                f"{title}.docx",
-            ],
+            "files_included": files_included,
         }
         if raw_findings:
             metadata["raw_data_files"] = list(raw_findings.keys())
 
-        zf.writestr("metadata.json", json.dumps(metadata, indent=2))
+        zf.writestr("metadata.json", _dump_json(metadata))
+
+    if sink is not None:
+        logger.info("Asset bundle written to sink")
+        return None
+    bundle_bytes = buffer.getvalue()
+    logger.info("Asset bundle created: %d bytes", len(bundle_bytes))
+    return bundle_bytes
+
 
-    buffer.seek(0)
-    logger.info("Asset bundle created: %d bytes", len(buffer.getvalue()))
-    return buffer.getvalue()
+# Characters dropped from filenames: anything but str.isalnum() characters
+# (which, with "_", is exactly what \w matches), spaces and hyphens
+_NON_FILENAME_RE = re.compile(r"[^\w \-]")
 
 
 def get_filename_from_title(title: str, extension: str = "") -> str:
     """Generate a safe filename from a title."""
     # Remove special characters and replace spaces
-    safe_title = "".join(
-        c if c.isalnum() or c in " -_" else "" for c in title
-    ).strip()
-    safe_title = safe_title.replace(" ", "-").lower()
+    safe_title = _NON_FILENAME_RE.sub("", title).strip().replace(" ", "-").lower()
 
     # Add date prefix
     date_prefix = datetime.now().strftime("%Y-%m-%d")
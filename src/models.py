@@ -1,13 +1,34 @@
 """Data models for market research agent."""
 
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, fields
+from functools import cached_property
 from typing import Optional
 
-
-@dataclass
+# __post_init__ validation tables, built once rather than per brief
+_REQUIRED_FIELDS = (
+    ("offering_what", "What you're building"),
+    ("offering_problem", "Problem it solves"),
+    ("target_customer", "Target customer"),
+    ("geography", "Geography/market"),
+    ("primary_question", "Primary research question"),
+)
+_VALID_DEPTHS = ("overview", "thorough", "deep_dive")
+_OPTIONAL_STR_FIELDS = (
+    "offering_delivery", "offering_pricing_model",
+    "customer_conversations", "segments_include_exclude",
+    "opportunity_thesis", "stage", "resources",
+    "kill_criteria", "already_known",
+)
+
+
+@dataclass(frozen=True)
 class ResearchBrief:
     """Captures all intake information for a research project.
 
+    Briefs are immutable once validated (``known_competitors`` is stored as
+    a tuple), so derived values such as agent prompts can be cached on the
+    instance (see ``_prompt_cache``).
+
     Based on the 15 intake questions across 6 phases:
     - Phase 1: The Offering (4 questions)
     - Phase 2: Customer Hypothesis (3 questions)
@@ -33,7 +54,7 @@ class ResearchBrief:
     segments_include_exclude: Optional[str] = None
 
     # Phase 3: Market Context
-    known_competitors: list[str] = field(default_factory=list)
+    known_competitors: tuple[str, ...] = ()
     opportunity_thesis: Optional[str] = None
 
     # Phase 4: Business Reality
@@ -49,109 +70,98 @@ class ResearchBrief:
 
     def __post_init__(self):
         """Validate fields after initialization."""
-        # Validate required string fields are non-empty
-        required_fields = {
-            "offering_what": "What you're building",
-            "offering_problem": "Problem it solves",
-            "target_customer": "Target customer",
-            "geography": "Geography/market",
-            "primary_question": "Primary research question",
-        }
-        for field_name, label in required_fields.items():
+        # Validate required string fields are non-empty, storing them stripped
+        for field_name, label in _REQUIRED_FIELDS:
             value = getattr(self, field_name)
             if not isinstance(value, str):
                 raise TypeError(f"{label} must be a string, got {type(value).__name__}")
             stripped = value.strip()
             if not stripped:
                 raise ValueError(f"{label} cannot be empty")
-            # Store stripped version
             object.__setattr__(self, field_name, stripped)
 
-        # Validate depth
-        valid_depths = {"overview", "thorough", "deep_dive"}
-        if self.depth not in valid_depths:
+        if self.depth not in _VALID_DEPTHS:
             raise ValueError(
-                f"depth must be one of {valid_depths}, got '{self.depth}'"
+                f"depth must be one of {_VALID_DEPTHS}, got '{self.depth}'"
             )
 
         # Strip whitespace from optional string fields
-        optional_str_fields = [
-            "offering_delivery", "offering_pricing_model",
-            "customer_conversations", "segments_include_exclude",
-            "opportunity_thesis", "stage", "resources",
-            "kill_criteria", "already_known",
-        ]
-        for field_name in optional_str_fields:
+        for field_name in _OPTIONAL_STR_FIELDS:
             value = getattr(self, field_name)
             if isinstance(value, str):
                 object.__setattr__(self, field_name, value.strip() or None)
 
-        # Validate known_competitors is a list
-        if not isinstance(self.known_competitors, list):
+        # Validate known_competitors is a list or tuple, stored as a tuple so
+        # the cached prompts and markdown cannot go stale
+        if not isinstance(self.known_competitors, (list, tuple)):
             raise TypeError(
-                f"known_competitors must be a list, got {type(self.known_competitors).__name__}"
+                "known_competitors must be a list or tuple, "
+                f"got {type(self.known_competitors).__name__}"
             )
+        object.__setattr__(self, "known_competitors", tuple(self.known_competitors))
+
+        # Per-brief cache of built agent prompts (not a dataclass field)
+        object.__setattr__(self, "_prompt_cache", {})
 
     def to_dict(self) -> dict:
         """Serialize to dictionary for passing to agents."""
-        return asdict(self)
+        # Fields are flat strings apart from known_competitors, so a shallow
+        # read replaces asdict()'s recursive walk. Competitors are stored as a
+        # tuple but handed out as a fresh list, as agents have always received.
+        # Reading field names skips _prompt_cache and the cached markdown.
+        values = self.__dict__
+        data = {name: values[name] for name in _FIELD_NAMES}
+        data["known_competitors"] = list(data["known_competitors"])
+        return data
+
+    @cached_property
+    def markdown(self) -> str:
+        """The brief rendered once via ``to_markdown()`` and reused."""
+        return self.to_markdown()
 
     def to_markdown(self) -> str:
         """Render as markdown for saving to file."""
-        lines = [
-            "# Research Brief",
-            "",
-            "## The Offering",
-            f"- **What:** {self.offering_what}",
-            f"- **Problem Solved:** {self.offering_problem}",
-        ]
-
-        if self.offering_delivery:
-            lines.append(f"- **Delivery Model:** {self.offering_delivery}")
-        if self.offering_pricing_model:
-            lines.append(f"- **Pricing Model:** {self.offering_pricing_model}")
-
-        lines.extend([
-            "",
-            "## Customer Hypothesis",
-            f"- **Target Customer:** {self.target_customer}",
-        ])
-
-        if self.customer_conversations:
-            lines.append(f"- **Customer Conversations:** {self.customer_conversations}")
-        if self.segments_include_exclude:
-            lines.append(f"- **Include/Exclude:** {self.segments_include_exclude}")
-
-        lines.extend([
-            "",
-            "## Market Context",
-            f"- **Geography:** {self.geography}",
-        ])
-
-        if self.known_competitors:
-            lines.append(f"- **Known Competitors:** {', '.join(self.known_competitors)}")
-        if self.opportunity_thesis:
-            lines.append(f"- **Opportunity Thesis:** {self.opportunity_thesis}")
-
-        lines.extend([
-            "",
-            "## Business Reality",
-        ])
-
-        if self.stage:
-            lines.append(f"- **Stage:** {self.stage}")
-        if self.resources:
-            lines.append(f"- **Resources:** {self.resources}")
-
-        lines.extend([
-            "",
-            "## Research Priorities",
-            f"- **#1 Question:** {self.primary_question}",
-        ])
-
-        if self.kill_criteria:
-            lines.append(f"- **Kill Criteria:** {self.kill_criteria}")
-        if self.already_known:
-            lines.append(f"- **Already Known:** {self.already_known}")
-
+        lines = ["# Research Brief"]
+        for heading, entries in _MARKDOWN_SECTIONS:
+            lines += ("", f"## {heading}")
+            # Required fields are non-empty after validation, so only unset
+            # optional fields are skipped
+            for label, field_name in entries:
+                value = getattr(self, field_name)
+                if value:
+                    if isinstance(value, tuple):
+                        value = ", ".join(value)
+                    lines.append(f"- **{label}:** {value}")
         return "\n".join(lines)
+
+
+_FIELD_NAMES = tuple(f.name for f in fields(ResearchBrief))
+
+# to_markdown layout: (section heading, ((label, field name), ...)) in order
+_MARKDOWN_SECTIONS = (
+    ("The Offering", (
+        ("What", "offering_what"),
+        ("Problem Solved", "offering_problem"),
+        ("Delivery Model", "offering_delivery"),
+        ("Pricing Model", "offering_pricing_model"),
+    )),
+    ("Customer Hypothesis", (
+        ("Target Customer", "target_customer"),
+        ("Customer Conversations", "customer_conversations"),
+        ("Include/Exclude", "segments_include_exclude"),
+    )),
+    ("Market Context", (
+        ("Geography", "geography"),
+        ("Known Competitors", "known_competitors"),
+        ("Opportunity Thesis", "opportunity_thesis"),
+    )),
+    ("Business Reality", (
+        ("Stage", "stage"),
+        ("Resources", "resources"),
+    )),
+    ("Research Priorities", (
+        ("#1 Question", "primary_question"),
+        ("Kill Criteria", "kill_criteria"),
+        ("Already Known", "already_known"),
+    )),
+)
@@ -3,19 +3,10 @@
 import asyncio
 import logging
 import os
+from types import MappingProxyType
 from typing import Optional
 
-from src.agents import (
-    CommunityMapper,
-    CompetitorProfiler,
-    LocalContext,
-    OpportunitySynthesizer,
-    PricingIntel,
-    SourceVerifier,
-    SubAgent,
-    TrendDetector,
-    VoiceMiner,
-)
+from src.agents import AGENT_CLASSES, SubAgent, close_client
 from src.models import ResearchBrief
 from src.schemas import validate_agent_result
 
@@ -30,6 +21,15 @@ BUDGET_CEILING = int(os.environ.get("RESEARCH_TOKEN_BUDGET", "0"))
 COST_PER_M_INPUT = 3.0   # ~$3 per 1M input tokens
 COST_PER_M_OUTPUT = 15.0  # ~$15 per 1M output tokens
 
+# Human-readable wave names, in wave order
+WAVE_DESCRIPTIONS = (
+    "Wave 1: Foundation - Finding communities and local context",
+    "Wave 2: Deep Research - Voice mining, competitor profiling, pricing intel",
+    "Wave 3: Trends - Analyzing momentum and timing",
+    "Wave 4: Synthesis - Combining all findings into report",
+    "Wave 5: Verification - Checking all sources and claims",
+)
+
 
 class ResearchOrchestrator:
     """Coordinates the execution of research agents in waves.
@@ -42,18 +42,15 @@ class ResearchOrchestrator:
     - Wave 5: Source Verifier
     """
 
-    def __init__(self):
-        """Initialize orchestrator with all agents."""
-        self.agents: list[SubAgent] = [
-            CommunityMapper(),
-            LocalContext(),
-            VoiceMiner(),
-            PricingIntel(),
-            CompetitorProfiler(),
-            TrendDetector(),
-            OpportunitySynthesizer(),
-            SourceVerifier(),
-        ]
+    def __init__(self, no_cache: bool = False):
+        """Initialize orchestrator with all agents.
+
+        Pass ``no_cache=True`` to bypass the API response cache, so every
+        agent researches afresh instead of replaying an earlier run's answer.
+        """
+        self.no_cache = no_cache
+        self.agents: list[SubAgent] = [agent_cls() for agent_cls in AGENT_CLASSES.values()]
+        self._agents_by_name: dict[str, SubAgent] = {agent.name: agent for agent in self.agents}
 
         # Define wave execution order
         self.waves: list[list[str]] = [
@@ -66,23 +63,23 @@ class ResearchOrchestrator:
 
         # Store results from each wave
         self.results: dict[str, dict] = {}
+        # Results the synthesizer reads, kept as agents finish so synthesis
+        # gets a read-only view instead of a filtered copy of self.results
+        self._research_findings: dict[str, dict] = {}
 
         # Track per-agent token usage: {agent_name: {input_tokens, output_tokens}}
         self.token_usage: dict[str, dict] = {}
+        # Running totals across all agents, kept alongside token_usage
+        self._total_input = 0
+        self._total_output = 0
 
     def get_agent(self, name: str) -> Optional[SubAgent]:
         """Get an agent by name."""
-        for agent in self.agents:
-            if agent.name == name:
-                return agent
-        return None
+        return self._agents_by_name.get(name)
 
     def get_total_tokens(self) -> int:
         """Return total input + output tokens across all agents."""
-        total = 0
-        for usage in self.token_usage.values():
-            total += usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
-        return total
+        return self._total_input + self._total_output
 
     def _extract_token_usage(self, agent_name: str, result: dict) -> dict:
         """Extract and accumulate _token_usage from an agent result.
@@ -92,17 +89,22 @@ class ResearchOrchestrator:
         """
         usage = result.pop("_token_usage", None)
         if usage:
+            input_tokens = usage.get("input_tokens", 0)
+            output_tokens = usage.get("output_tokens", 0)
             if agent_name not in self.token_usage:
                 self.token_usage[agent_name] = {"input_tokens": 0, "output_tokens": 0}
-            self.token_usage[agent_name]["input_tokens"] += usage.get("input_tokens", 0)
-            self.token_usage[agent_name]["output_tokens"] += usage.get("output_tokens", 0)
-            logger.info(
-                "Token usage for %s: input=%d, output=%d (cumulative total=%d)",
-                agent_name,
-                usage.get("input_tokens", 0),
-                usage.get("output_tokens", 0),
-                self.get_total_tokens(),
-            )
+            self.token_usage[agent_name]["input_tokens"] += input_tokens
+            self.token_usage[agent_name]["output_tokens"] += output_tokens
+            self._total_input += input_tokens
+            self._total_output += output_tokens
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "Token usage for %s: input=%d, output=%d (cumulative total=%d)",
+                    agent_name,
+                    input_tokens,
+                    output_tokens,
+                    self.get_total_tokens(),
+                )
         return result
 
     def _check_budget(self) -> bool:
@@ -123,87 +125,136 @@ class ResearchOrchestrator:
             return False
         return True
 
-    async def run_wave(self, wave_index: int, brief: ResearchBrief) -> dict[str, dict]:
+    async def run_wave(
+        self,
+        wave_index: int,
+        brief: ResearchBrief,
+        on_agent_complete=None,
+        on_report_text=None,
+    ) -> dict[str, dict]:
         """Run all agents in a wave in parallel.
 
+        Results are recorded as each agent finishes rather than after the
+        slowest one, so partial findings are available while the wave runs.
+
         Args:
             wave_index: Which wave to run (0-4)
             brief: The research brief
+            on_agent_complete: Optional callback(agent_name, result) called as each agent finishes
+            on_report_text: Optional callback(text) receiving the synthesis report as it streams
 
         Returns:
             Dict mapping agent names to their results
         """
         wave_agents = self.waves[wave_index]
-        tasks = []
+        runs = []
 
         for agent_name in wave_agents:
             agent = self.get_agent(agent_name)
             if agent:
                 # Pass accumulated results for later waves
                 if agent_name == "OpportunitySynthesizer":
-                    coro = self._run_synthesizer(agent, brief)
+                    coro = self._run_synthesizer(agent, brief, on_report_text)
                 elif agent_name == "SourceVerifier":
                     coro = self._run_verifier(agent, brief)
                 else:
                     coro = self._run_agent(agent, brief)
 
                 # Wrap each agent with a timeout
-                tasks.append(asyncio.wait_for(coro, timeout=AGENT_TIMEOUT))
-
-        # Run all agents in this wave in parallel, capturing exceptions
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Process results, separating successes from failures
+                runs.append(self._run_with_timeout(agent_name, coro))
+
+        # Single-agent waves (trends, synthesis, verification) need no task
+        # fan-out; awaiting directly also propagates cancellation
+        if len(runs) == 1:
+            agent_name, result = await runs[0]
+            result = self._record_result(agent_name, result)
+            if on_agent_complete:
+                on_agent_complete(agent_name, result)
+            return {agent_name: result}
+
+        # Run all agents in this wave in parallel, handling each as it finishes
+        tasks = [asyncio.ensure_future(run) for run in runs]
         wave_results = {}
-        for agent_name, result in zip(wave_agents, results):
-            if isinstance(result, asyncio.TimeoutError):
-                logger.error("Agent %s timed out after %ds", agent_name, AGENT_TIMEOUT)
-                wave_results[agent_name] = {
-                    "error": f"Agent timed out after {AGENT_TIMEOUT}s"
-                }
-                self.results[agent_name] = wave_results[agent_name]
-            elif isinstance(result, Exception):
-                logger.error("Agent %s failed: %s", agent_name, result, exc_info=result)
-                wave_results[agent_name] = {"error": str(result)}
-                self.results[agent_name] = wave_results[agent_name]
-            else:
-                logger.info("Agent %s completed successfully", agent_name)
-                # Extract token usage metadata before storing results
-                self._extract_token_usage(agent_name, result)
-                # Validate result schema
-                validation_warnings = validate_agent_result(agent_name, result)
-                for warning in validation_warnings:
-                    logger.warning("Schema validation: %s", warning)
-                wave_results[agent_name] = result
-                self.results[agent_name] = result
-
-        return wave_results
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                agent_name, result = await next_done
+                wave_results[agent_name] = self._record_result(agent_name, result)
+                if on_agent_complete:
+                    on_agent_complete(agent_name, wave_results[agent_name])
+        finally:
+            # Like a TaskGroup, never leave agents running once the wave is
+            # abandoned (cancelled, or a callback raised)
+            for task in tasks:
+                task.cancel()
+
+        # Report in wave order regardless of completion order
+        return {name: wave_results[name] for name in wave_agents if name in wave_results}
+
+    async def _run_with_timeout(self, agent_name: str, coro) -> tuple[str, object]:
+        """Await *coro* under AGENT_TIMEOUT, returning (agent_name, result or exception)."""
+        try:
+            return agent_name, await asyncio.wait_for(coro, timeout=AGENT_TIMEOUT)
+        except Exception as e:
+            return agent_name, e
+
+    def _record_result(self, agent_name: str, result) -> dict:
+        """Store one agent's result (or failure) in self.results and return it."""
+        if isinstance(result, asyncio.TimeoutError):
+            logger.error("Agent %s timed out after %ds", agent_name, AGENT_TIMEOUT)
+            result = {"error": f"Agent timed out after {AGENT_TIMEOUT}s"}
+        elif isinstance(result, Exception):
+            logger.error("Agent %s failed: %s", agent_name, result, exc_info=result)
+            result = {"error": str(result)}
+        else:
+            logger.info("Agent %s completed successfully", agent_name)
+            # Extract token usage metadata before storing results
+            self._extract_token_usage(agent_name, result)
+            # Validate result schema
+            validation_warnings = validate_agent_result(agent_name, result)
+            for warning in validation_warnings:
+                logger.warning("Schema validation: %s", warning)
+        self.results[agent_name] = result
+        if agent_name != "OpportunitySynthesizer":
+            self._research_findings[agent_name] = result
+        return result
 
     async def _run_agent(self, agent: SubAgent, brief: ResearchBrief) -> dict:
         """Run a standard agent."""
-        return await agent.run(brief)
-
-    async def _run_synthesizer(self, agent: SubAgent, brief: ResearchBrief) -> dict:
-        """Run the synthesizer with all previous findings."""
-        # Gather findings from waves 1-3
-        findings = {k: v for k, v in self.results.items() if k != "OpportunitySynthesizer"}
-        return await agent.run(brief, findings=findings)
+        return await agent.run(brief, no_cache=self.no_cache)
+
+    async def _run_synthesizer(
+        self, agent: SubAgent, brief: ResearchBrief, on_text=None
+    ) -> dict:
+        """Run the synthesizer with all previous findings, streaming to *on_text*."""
+        return await agent.run(
+            brief,
+            no_cache=self.no_cache,
+            findings=MappingProxyType(self._research_findings),
+            on_text=on_text,
+        )
 
     async def _run_verifier(self, agent: SubAgent, brief: ResearchBrief) -> dict:
         """Run the source verifier on the synthesized report."""
         synthesizer_result = self.results.get("OpportunitySynthesizer", {})
-        return await agent.run(brief, report=synthesizer_result)
+        return await agent.run(brief, no_cache=self.no_cache, report=synthesizer_result)
 
     async def run_all(
         self,
         brief: ResearchBrief,
         on_wave_complete=None,
+        on_agent_complete=None,
+        on_report_text=None,
     ) -> dict[str, dict]:
         """Run all waves sequentially.
 
+        The API client and source-check HTTP session stay open for later
+        runs on the same event loop; see ``aclose``.
+
         Args:
             brief: The research brief
             on_wave_complete: Optional callback(wave_index, results) called after each wave
+            on_agent_complete: Optional callback(agent_name, result) called as each agent finishes
+            on_report_text: Optional callback(text) receiving the synthesis report as it streams
 
         Returns:
             Dict mapping all agent names to their results
@@ -221,7 +272,9 @@ class ResearchOrchestrator:
             logger.info(
                 "Starting %s", self.get_wave_description(wave_idx)
             )
-            wave_results = await self.run_wave(wave_idx, brief)
+            wave_results = await self.run_wave(
+                wave_idx, brief, on_agent_complete, on_report_text
+            )
             logger.info(
                 "Completed %s: %d agents finished",
                 self.get_wave_description(wave_idx),
@@ -235,8 +288,15 @@ class ResearchOrchestrator:
         report_text = synthesizer_result.get("response", synthesizer_result.get("report", ""))
         if report_text and isinstance(report_text, str):
             try:
-                from src.source_checker import verify_report_sources
-                source_check = await verify_report_sources(report_text)
+                # Reuse the SourceVerifier's HTTP check when it ran
+                verifier_result = self.results.get("SourceVerifier")
+                source_check = (
+                    verifier_result.get("source_check")
+                    if isinstance(verifier_result, dict) else None
+                )
+                if source_check is None:
+                    from src.source_checker import verify_report_sources
+                    source_check = await verify_report_sources(report_text)
                 self.results["_source_check"] = source_check
                 if source_check.get("dead_urls"):
                     logger.warning(
@@ -249,12 +309,8 @@ class ResearchOrchestrator:
                 logger.warning("HTTP source verification failed: %s", e)
 
         # Log final token usage summary and estimated cost
-        total_input = sum(
-            u.get("input_tokens", 0) for u in self.token_usage.values()
-        )
-        total_output = sum(
-            u.get("output_tokens", 0) for u in self.token_usage.values()
-        )
+        total_input = self._total_input
+        total_output = self._total_output
         total_tokens = total_input + total_output
         estimated_cost = (
             (total_input / 1_000_000) * COST_PER_M_INPUT
@@ -270,26 +326,33 @@ class ResearchOrchestrator:
             estimated_cost,
         )
 
-        # Log per-agent breakdown
-        for agent_name, usage in self.token_usage.items():
-            logger.info(
-                "  %s: input=%d, output=%d",
-                agent_name,
-                usage.get("input_tokens", 0),
-                usage.get("output_tokens", 0),
-            )
+        # Log per-agent breakdown (skip the walk entirely when INFO is off)
+        if logger.isEnabledFor(logging.INFO):
+            for agent_name, usage in self.token_usage.items():
+                logger.info(
+                    "  %s: input=%d, output=%d",
+                    agent_name,
+                    usage.get("input_tokens", 0),
+                    usage.get("output_tokens", 0),
+                )
 
         return self.results
 
+    @staticmethod
+    async def aclose() -> None:
+        """Close the running event loop's API client and source-check session.
+
+        Both are shared by every orchestrator on the loop, so ``run_all``
+        leaves them open; whoever owns the loop awaits this once no research
+        run on it is still going.
+        """
+        from src.source_checker import close_session
+
+        await close_client()
+        await close_session()
+
     def get_wave_description(self, wave_index: int) -> str:
         """Get a human-readable description of a wave."""
-        descriptions = [
-            "Wave 1: Foundation - Finding communities and local context",
-            "Wave 2: Deep Research - Voice mining, competitor profiling, pricing intel",
-            "Wave 3: Trends - Analyzing momentum and timing",
-            "Wave 4: Synthesis - Combining all findings into report",
-            "Wave 5: Verification - Checking all sources and claims",
-        ]
-        if 0 <= wave_index < len(descriptions):
-            return descriptions[wave_index]
+        if 0 <= wave_index < len(WAVE_DESCRIPTIONS):
+            return WAVE_DESCRIPTIONS[wave_index]
         return f"Wave {wave_index + 1}"
@@ -1,23 +1,93 @@
 """Agent result schema validation."""
 
 import logging
+from typing import Any, TypedDict
 
 logger = logging.getLogger(__name__)
 
-# Expected top-level keys per agent type.
-# "response" is the fallback key when the API returns non-JSON text.
-AGENT_SCHEMAS: dict[str, set[str]] = {
-    "CommunityMapper": {"communities", "platforms", "response"},
-    "VoiceMiner": {"quotes", "pain_points", "desires", "language_patterns", "response"},
-    "PricingIntel": {"competitor_pricing", "market_rates", "willingness_to_pay", "response"},
-    "CompetitorProfiler": {"competitors", "response"},
-    "LocalContext": {"economic_context", "digital_landscape", "cultural_factors", "response"},
-    "TrendDetector": {"trends", "search_trends", "funding", "response"},
-    "OpportunitySynthesizer": {"report", "executive_summary", "response"},
-    "SourceVerifier": {"verification_score", "sources", "unsupported_claims", "response"},
+
+class AgentFindings(TypedDict, total=False):
+    """Keys any agent result may carry besides its own findings.
+
+    "response" is the fallback key when the API returns non-JSON text.
+    """
+
+    response: str
+
+
+class CommunityFindings(AgentFindings, total=False):
+    communities: Any
+    platforms: Any
+
+
+class VoiceFindings(AgentFindings, total=False):
+    quotes: Any
+    pain_points: Any
+    desires: Any
+    language_patterns: Any
+
+
+class PricingFindings(AgentFindings, total=False):
+    competitor_pricing: Any
+    market_rates: Any
+    willingness_to_pay: Any
+
+
+class CompetitorFindings(AgentFindings, total=False):
+    competitors: Any
+
+
+class LocalContextFindings(AgentFindings, total=False):
+    economic_context: Any
+    digital_landscape: Any
+    cultural_factors: Any
+
+
+class TrendFindings(AgentFindings, total=False):
+    trends: Any
+    search_trends: Any
+    funding: Any
+
+
+class SynthesisFindings(AgentFindings, total=False):
+    report: str
+    executive_summary: str
+
+
+class VerificationFindings(AgentFindings, total=False):
+    verification_score: int
+    sources: list[dict]
+    unsupported_claims: list[str]
+
+
+AGENT_FINDINGS: dict[str, type] = {
+    "CommunityMapper": CommunityFindings,
+    "VoiceMiner": VoiceFindings,
+    "PricingIntel": PricingFindings,
+    "CompetitorProfiler": CompetitorFindings,
+    "LocalContext": LocalContextFindings,
+    "TrendDetector": TrendFindings,
+    "OpportunitySynthesizer": SynthesisFindings,
+    "SourceVerifier": VerificationFindings,
+}
+
+# Expected top-level keys per agent type, derived from the TypedDicts above.
+AGENT_SCHEMAS: dict[str, frozenset[str]] = {
+    agent_name: frozenset(findings.__annotations__)
+    for agent_name, findings in AGENT_FINDINGS.items()
 }
 
 
+# JSON containers and strings that count as "no findings" when empty; 0 and
+# False are meaningful values, and their types are deliberately absent
+_EMPTY_CHECKED_TYPES = (str, list, dict)
+
+
+def _is_empty(value) -> bool:
+    """True for None, "", [] and {} (one type check instead of three compares)."""
+    return value is None or (type(value) in _EMPTY_CHECKED_TYPES and not value)
+
+
 def validate_agent_result(agent_name: str, result: dict) -> list[str]:
     """Validate an agent result against its expected schema.
 
@@ -39,19 +109,18 @@ def validate_agent_result(agent_name: str, result: dict) -> list[str]:
         warnings.append(f"{agent_name}: unknown agent type, cannot validate")
         return warnings
 
-    # Check if result has at least one expected key
-    result_keys = set(result.keys()) - {"_token_usage"}
-    matching = result_keys & expected
+    # Check if result has at least one expected key (_token_usage never is one)
+    matching = result.keys() & expected
     if not matching:
+        result_keys = sorted(key for key in result if key != "_token_usage")
         warnings.append(
             f"{agent_name}: result has no expected keys. "
-            f"Got {sorted(result_keys)}, expected at least one of {sorted(expected)}"
+            f"Got {result_keys}, expected at least one of {sorted(expected)}"
         )
 
     # Check for empty results
     for key in matching:
-        value = result[key]
-        if value is None or value == "" or value == [] or value == {}:
+        if _is_empty(result[key]):
             warnings.append(f"{agent_name}: key '{key}' is empty")
 
     return warnings
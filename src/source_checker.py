@@ -1,22 +1,46 @@
 """HTTP-based source URL verification."""
 
 import asyncio
+import hashlib
 import logging
+import os
 import re
-from dataclasses import dataclass, field
-from urllib.parse import urlparse
+import time
+import weakref
+from collections import Counter, OrderedDict
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse, urlsplit, urlunsplit
 
 import aiohttp
+import orjson
 
 logger = logging.getLogger(__name__)
 
 # Timeout per request
 REQUEST_TIMEOUT = 10  # seconds
+# Shared by every request (ClientTimeout is immutable)
+_TIMEOUT = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+# The GET fallback asks for one uncompressed byte; servers that ignore Range
+# answer 200 with the full body, which is still never read
+_RANGE_PROBE_HEADERS = {"Range": "bytes=0-0", "Accept-Encoding": "identity"}
 # Max concurrent requests
 MAX_CONCURRENT = 10
+# Max open connections to any one host, and how long resolved addresses are kept
+MAX_PER_HOST = 4
+DNS_CACHE_TTL = 300  # seconds
+# Max recent check results kept in-process: 0 disables the in-process cache
+SOURCE_CHECK_CACHE_SIZE = int(os.environ.get("SOURCE_CHECK_CACHE_SIZE", "1024"))
+# Directory for an on-disk check cache that survives restarts (unset disables it)
+SOURCE_CHECK_CACHE_DIR = os.environ.get("SOURCE_CHECK_CACHE_DIR", "")
+# Live URLs rarely die within a day; failures are rechecked sooner so
+# transient outages can recover
+ALIVE_TTL = 24 * 3600  # seconds
+FAILED_TTL = 3600  # seconds
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceCheckResult:
     """Result of checking a single URL."""
     url: str
@@ -26,23 +50,25 @@ class SourceCheckResult:
     error: str | None = None
 
 
-# Regex to extract URLs from markdown text
+# Regex to extract URLs from markdown text. The literal "http" prefix lets re
+# skip ahead with a fast substring search and the character class cannot
+# backtrack, so a scan stays linear (~1ms per MB of report text).
 _URL_RE = re.compile(r'https?://[^\s)\]>"\']+')
 
 
 def extract_urls(text: str) -> list[str]:
-    """Extract all HTTP/HTTPS URLs from text."""
-    urls = _URL_RE.findall(text)
-    # Deduplicate while preserving order
-    seen = set()
-    unique = []
-    for url in urls:
-        # Strip trailing punctuation that isn't part of URL
+    """Extract all HTTP/HTTPS URLs from text.
+
+    Spellings of one URL (see ``_cache_key``) are listed once, as first seen.
+    """
+    if "://" not in text:
+        return []
+    urls: dict[str, str] = {}
+    for url in _URL_RE.findall(text):
+        # Strip trailing punctuation that isn't part of the URL
         url = url.rstrip(".,;:!?")
-        if url not in seen:
-            seen.add(url)
-            unique.append(url)
-    return unique
+        urls.setdefault(_cache_key(url), url)
+    return list(urls.values())
 
 
 async def check_url(session: aiohttp.ClientSession, url: str) -> SourceCheckResult:
@@ -55,7 +81,7 @@ async def check_url(session: aiohttp.ClientSession, url: str) -> SourceCheckResu
     try:
         async with session.head(
             url,
-            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+            timeout=_TIMEOUT,
             allow_redirects=True,
             ssl=False,
         ) as resp:
@@ -67,15 +93,18 @@ async def check_url(session: aiohttp.ClientSession, url: str) -> SourceCheckResu
                     redirect_url=redirect_url,
                 )
             elif resp.status == 405:
-                # HEAD not allowed, try GET
+                # HEAD not allowed, try a GET for just the first byte
                 async with session.get(
                     url,
-                    timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                    headers=_RANGE_PROBE_HEADERS,
+                    timeout=_TIMEOUT,
                     allow_redirects=True,
                     ssl=False,
                 ) as get_resp:
                     redirect_url = str(get_resp.url) if str(get_resp.url) != url else None
-                    status = "alive" if get_resp.status < 400 else "dead"
+                    # 416 means the resource exists but is shorter than the range
+                    alive = get_resp.status < 400 or get_resp.status == 416
+                    status = "alive" if alive else "dead"
                     return SourceCheckResult(
                         url=url, status=status,
                         status_code=get_resp.status,
@@ -94,18 +123,182 @@ async def check_url(session: aiohttp.ClientSession, url: str) -> SourceCheckResu
         return SourceCheckResult(url=url, status="error", error=str(e))
 
 
+# Recent check results keyed by _cache_key(url): (expiry timestamp, result),
+# LRU order
+_result_cache: OrderedDict[str, tuple[float, SourceCheckResult]] = OrderedDict()
+
+
+def _cache_key(url: str) -> str:
+    """Normalize *url* for deduplication and the result cache.
+
+    Scheme and host are case-insensitive, an empty path requests ``/`` and
+    the fragment is never sent, so ``HTTPS://Example.com/a#intro`` shares a
+    cache entry with ``https://example.com/a`` and ``https://example.com``
+    with ``https://example.com/``.
+    """
+    try:
+        parts = urlsplit(url)
+    except ValueError:  # e.g. an unterminated IPv6 host
+        return url
+    return urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, "",
+    ))
+
+
+def _cache_path(key: str) -> Path:
+    """On-disk cache file for a cache key."""
+    digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+    return Path(SOURCE_CHECK_CACHE_DIR, f"{digest}.json")
+
+
+def _remember_result(key: str, expires: float, result: SourceCheckResult) -> None:
+    """Add a result to the in-process LRU, evicting the oldest entries."""
+    if SOURCE_CHECK_CACHE_SIZE <= 0:
+        return
+    _result_cache[key] = (expires, result)
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > SOURCE_CHECK_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+
+def _load_cached_result(url: str) -> Optional[SourceCheckResult]:
+    """Look up an unexpired check result in memory, then on disk.
+
+    A hit stored under another spelling of *url* is returned relabelled
+    with *url*.
+    """
+    key = _cache_key(url)
+    now = time.time()
+    cached = _result_cache.get(key)
+    if cached is not None:
+        if cached[0] > now:
+            _result_cache.move_to_end(key)
+            result = cached[1]
+            return result if result.url == url else replace(result, url=url)
+        del _result_cache[key]
+    if not SOURCE_CHECK_CACHE_DIR:
+        return None
+    try:
+        entry = orjson.loads(_cache_path(key).read_bytes())
+        expires, result = entry["expires"], SourceCheckResult(**entry["result"])
+    except FileNotFoundError:
+        return None
+    except (OSError, orjson.JSONDecodeError, KeyError, TypeError) as e:
+        logger.warning("Ignoring unreadable source check cache entry for %s: %s", url, e)
+        return None
+    if expires <= now or _cache_key(result.url) != key:
+        return None
+    _remember_result(key, expires, result)
+    return result if result.url == url else replace(result, url=url)
+
+
+def _store_result(result: SourceCheckResult) -> None:
+    """Cache a check result in memory and, if configured, on disk."""
+    ttl = ALIVE_TTL if result.status == "alive" else FAILED_TTL
+    expires = time.time() + ttl
+    key = _cache_key(result.url)
+    _remember_result(key, expires, result)
+    if not SOURCE_CHECK_CACHE_DIR:
+        return
+    path = _cache_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(orjson.dumps({"expires": expires, "result": asdict(result)}))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Could not write source check cache entry for %s: %s", result.url, e)
+
+
+def clear_source_check_cache() -> None:
+    """Drop all cached URL check results held in memory."""
+    _result_cache.clear()
+
+
+_HEADERS = {"User-Agent": "MarketResearchBot/1.0 (source verification)"}
+
+# One pooled HTTP session per event loop, shared by every verification on it
+# so DNS lookups and keep-alive connections carry over between them.
+# close_session() releases it; ResearchOrchestrator.aclose() calls it
+# for whoever owns the loop once no research run on it is still going. A
+# session holds its loop, so this is a plain dict pruned of closed loops
+# rather than a WeakKeyDictionary (which the session would keep alive).
+_sessions: dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Return the pooled HTTP session for the running event loop."""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        for stale in [other for other in _sessions if other.is_closed()]:
+            del _sessions[stale]
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONCURRENT, limit_per_host=MAX_PER_HOST, ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        session = _sessions[loop] = aiohttp.ClientSession(headers=_HEADERS, connector=connector)
+    return session
+
+
+async def close_session() -> None:
+    """Close the running event loop's pooled HTTP session, if it has one."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+# URL checks currently in flight, per event loop (futures cannot be shared
+# across loops), so overlapping verifications send one request per URL
+_inflight: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def _shared_check(url: str, start_check) -> asyncio.Future:
+    """Return the in-flight check for *url*, starting it with *start_check* if none.
+
+    Checks are shared by cache key, so the result may be labelled with
+    another spelling of *url*.
+    """
+    inflight = _inflight.setdefault(asyncio.get_running_loop(), {})
+    key = _cache_key(url)
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(start_check())
+
+        def forget(done):
+            if inflight.get(key) is done:
+                del inflight[key]
+
+        task.add_done_callback(forget)
+    # Shielded so one caller being cancelled does not cancel the others' check
+    return asyncio.shield(task)
+
+
 async def check_urls(urls: list[str]) -> list[SourceCheckResult]:
-    """Check multiple URLs concurrently with a semaphore."""
+    """Check multiple URLs concurrently with a semaphore.
+
+    Recently checked URLs are answered from the cache without a request.
+    """
+    results = [_load_cached_result(url) for url in urls]
+    pending = [i for i, result in enumerate(results) if result is None]
+    if not pending:
+        return results
+
     semaphore = asyncio.Semaphore(MAX_CONCURRENT)
 
     async def limited_check(session, url):
         async with semaphore:
-            return await check_url(session, url)
+            result = await check_url(session, url)
+        _store_result(result)
+        return result
 
-    headers = {"User-Agent": "MarketResearchBot/1.0 (source verification)"}
-    async with aiohttp.ClientSession(headers=headers) as session:
-        tasks = [limited_check(session, url) for url in urls]
-        return await asyncio.gather(*tasks)
+    session = _get_session()
+    tasks = [
+        _shared_check(urls[i], lambda url=urls[i]: limited_check(session, url))
+        for i in pending
+    ]
+    for i, result in zip(pending, await asyncio.gather(*tasks)):
+        results[i] = result if result.url == urls[i] else replace(result, url=urls[i])
+    return results
 
 
 async def verify_report_sources(report_text: str) -> dict:
@@ -127,10 +320,12 @@ async def verify_report_sources(report_text: str) -> dict:
     logger.info("Checking %d URLs from report", len(urls))
     results = await check_urls(urls)
 
-    alive = sum(1 for r in results if r.status == "alive")
-    dead = sum(1 for r in results if r.status == "dead")
-    timeout = sum(1 for r in results if r.status == "timeout")
-    errors = sum(1 for r in results if r.status in ("error", "invalid"))
+    # One counting pass instead of one generator per status
+    counts = Counter(r.status for r in results)
+    alive = counts["alive"]
+    dead = counts["dead"]
+    timeout = counts["timeout"]
+    errors = counts["error"] + counts["invalid"]
 
     dead_urls = [
         {"url": r.url, "status_code": r.status_code, "error": r.error}
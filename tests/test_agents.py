@@ -5,6 +5,9 @@ from unittest.mock import AsyncMock, patch
 import pytest
 
 from src.agents import (
+    AGENT_CLASSES,
+    QUALITY_LENSES,
+    SEARCH_CONFIG,
     CommunityMapper,
     CompetitorProfiler,
     LocalContext,
@@ -14,6 +17,7 @@ from src.agents import (
     SubAgent,
     TrendDetector,
     VoiceMiner,
+    get_vicious_search_instructions,
 )
 from src.models import ResearchBrief
 
@@ -31,6 +35,54 @@ def sample_brief():
     )
 
 
+class TestSearchInstructions:
+    """Test the shared search protocol builder."""
+
+    def test_instructions_are_cached(self):
+        """Repeated calls return the cached string."""
+        first = get_vicious_search_instructions("deep_dive", "VoiceMiner")
+        assert get_vicious_search_instructions("deep_dive", "VoiceMiner") is first
+        assert "Voice Miner" in first
+        assert "Would you bet money" in first
+
+    def test_prompt_config_is_read_only(self):
+        """The lens and depth tables cannot be mutated at runtime."""
+        with pytest.raises(TypeError):
+            QUALITY_LENSES["VoiceMiner"] = "changed"
+        with pytest.raises(TypeError):
+            SEARCH_CONFIG["thorough"]["behavior"] = "changed"
+
+
+class TestPromptTemplates:
+    """Test the agent prompt templates."""
+
+    def test_every_agent_task_renders(self, sample_brief):
+        """Each research agent's templates only reference known prompt vars."""
+        for agent_cls in (CommunityMapper, VoiceMiner, PricingIntel,
+                          CompetitorProfiler, LocalContext, TrendDetector):
+            agent = agent_cls()
+            prompt_vars = agent.prompt_vars(sample_brief)
+            assert "{" not in agent.task.format_map(prompt_vars)
+            for _label, template in agent.brief_fields:
+                template.format_map(prompt_vars)
+
+    def test_prompt_vars_are_shared_per_brief(self, sample_brief):
+        """Brief-derived prompt values are computed once and shared read-only."""
+        prompt_vars = CommunityMapper().prompt_vars(sample_brief)
+        assert VoiceMiner().prompt_vars(sample_brief) is prompt_vars
+        assert prompt_vars["competitors"] == "Notion, Asana"
+        with pytest.raises(TypeError):
+            prompt_vars["geography"] = "changed"
+
+    def test_research_agents_share_one_builder(self):
+        """Research agents describe prompts as data instead of overriding build_prompt."""
+        for agent_cls in (CommunityMapper, VoiceMiner, PricingIntel,
+                          CompetitorProfiler, LocalContext, TrendDetector):
+            assert "build_prompt" not in vars(agent_cls)
+            assert agent_cls.task
+            assert agent_cls.brief_fields
+
+
 class TestSubAgent:
     """Test the base SubAgent class."""
 
@@ -39,6 +91,22 @@ class TestSubAgent:
         agent = SubAgent(name="TestAgent")
         assert agent.name == "TestAgent"
 
+    def test_subagent_has_no_instance_dict(self):
+        """SubAgent stores its fields in slots."""
+        agent = SubAgent(name="TestAgent")
+        assert not hasattr(agent, "__dict__")
+
+    def test_agent_subclasses_have_no_instance_dict(self):
+        """Concrete agents keep the base class's slotted layout."""
+        for agent_cls in AGENT_CLASSES.values():
+            assert not hasattr(agent_cls(), "__dict__")
+
+    def test_agent_registry_matches_agent_names(self):
+        """AGENT_CLASSES is keyed by each agent's runtime name."""
+        assert len(AGENT_CLASSES) == 8
+        for name, agent_cls in AGENT_CLASSES.items():
+            assert agent_cls().name == name
+
     def test_subagent_has_mission(self):
         """SubAgent has a mission description."""
         agent = SubAgent(name="TestAgent", mission="Do something useful")
@@ -48,8 +116,8 @@ class TestSubAgent:
     async def test_subagent_run_returns_result(self, sample_brief):
         """SubAgent.run() returns a result dict."""
         agent = SubAgent(name="TestAgent")
-        # Mock the API call
-        with patch.object(agent, "_call_api", new_callable=AsyncMock) as mock_api:
+        # Mock the API call (SubAgent instances are slotted, so patch the class)
+        with patch.object(SubAgent, "_call_api", new_callable=AsyncMock) as mock_api:
             mock_api.return_value = {"findings": "test data"}
             result = await agent.run(sample_brief)
             assert isinstance(result, dict)
@@ -71,6 +139,13 @@ class TestCommunityMapper:
         assert "freelance designers" in prompt
         assert "United States" in prompt
 
+    def test_build_prompt_is_memoized_per_brief(self, sample_brief):
+        """Rebuilding the prompt for the same brief reuses the cached string."""
+        first = CommunityMapper().build_prompt(sample_brief)
+        second = CommunityMapper().build_prompt(sample_brief)
+        assert first is second
+        assert VoiceMiner().build_prompt(sample_brief) != first
+
 
 class TestVoiceMiner:
     """Test the VoiceMiner agent."""
@@ -151,6 +226,25 @@ class TestOpportunitySynthesizer:
         assert isinstance(prompt, str)
         assert len(prompt) > 100
 
+    def test_synthesis_prompt_embeds_findings_as_json(self, sample_brief):
+        """Structured findings are embedded as JSON, text responses verbatim."""
+        agent = OpportunitySynthesizer()
+        findings = {
+            "CommunityMapper": {"communities": ["r/design"]},
+            "VoiceMiner": {"response": "Designers hate invoicing."},
+        }
+        prompt = agent.build_synthesis_prompt(sample_brief, findings)
+        assert '{"communities":["r/design"]}' in prompt
+        assert "### VoiceMiner\nDesigners hate invoicing." in prompt
+        assert "{'communities'" not in prompt
+
+    def test_synthesis_prompt_keeps_unicode_and_int_keys(self, sample_brief):
+        """Non-ASCII text stays readable and non-string keys do not break JSON."""
+        agent = OpportunitySynthesizer()
+        findings = {"LocalContext": {"city": "São Paulo", "by_year": {2024: "growth"}}}
+        prompt = agent.build_synthesis_prompt(sample_brief, findings)
+        assert '{"city":"São Paulo","by_year":{"2024":"growth"}}' in prompt
+
 
 class TestSourceVerifier:
     """Test the SourceVerifier agent."""
@@ -159,3 +253,39 @@ class TestSourceVerifier:
         """SourceVerifier has the right identity."""
         agent = SourceVerifier()
         assert agent.name == "SourceVerifier"
+
+    @pytest.mark.asyncio
+    async def test_source_verifier_checks_urls_locally(self, sample_brief):
+        """URL status comes from the HTTP check; the API only lists unsupported claims."""
+        agent = SourceVerifier()
+        source_check = {
+            "total_urls": 2,
+            "alive": 1,
+            "dead": 1,
+            "timeout": 0,
+            "errors": 0,
+            "dead_urls": [{"url": "https://bad.com", "status_code": 404, "error": None}],
+            "results": [
+                {"url": "https://good.com", "status": "alive", "status_code": 200,
+                 "redirect_url": None, "error": None},
+                {"url": "https://bad.com", "status": "dead", "status_code": 404,
+                 "redirect_url": None, "error": None},
+            ],
+        }
+        report = {"response": "See https://good.com and https://bad.com. 90% agree."}
+
+        with patch("src.source_checker.verify_report_sources", new_callable=AsyncMock) as mock_check, \
+                patch.object(SourceVerifier, "_call_api", new_callable=AsyncMock) as mock_api:
+            mock_check.return_value = source_check
+            mock_api.return_value = {
+                "unsupported_claims": ["90% agree"],
+                "_token_usage": {"input_tokens": 10, "output_tokens": 5},
+            }
+            result = await agent.run(sample_brief, report=report)
+
+        mock_check.assert_awaited_once_with(report["response"])
+        assert result["verification_score"] == 50
+        assert [s["status"] for s in result["sources"]] == ["VERIFIED", "QUESTIONABLE"]
+        assert result["unsupported_claims"] == ["90% agree"]
+        assert result["source_check"] is source_check
+        assert result["_token_usage"]["input_tokens"] == 10
@@ -1,13 +1,71 @@
 """Tests for Anthropic API integration."""
 
+import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import anthropic
 import pytest
 
-from src.agents import CommunityMapper, SubAgent
+from src.agents import (
+    FINDINGS_TOOL_NAME,
+    CommunityMapper,
+    OpportunitySynthesizer,
+    SourceVerifier,
+    SubAgent,
+    TrendDetector,
+    clear_response_cache,
+)
 from src.models import ResearchBrief
 
 
+def _fake_stream(final_message, deltas=()):
+    """Build a stand-in for client.messages.stream yielding *deltas*."""
+
+    class FakeStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        @property
+        async def text_stream(self):
+            for delta in deltas:
+                yield delta
+
+        async def get_final_message(self):
+            return final_message
+
+    return MagicMock(side_effect=lambda **kwargs: FakeStream())
+
+
+@pytest.fixture(autouse=True)
+def empty_response_cache():
+    """Start every test with an empty response cache."""
+    clear_response_cache()
+    yield
+    clear_response_cache()
+
+
+@pytest.fixture
+def mock_anthropic(monkeypatch):
+    """Patch the Anthropic SDK with a mocked client and a JSON text response.
+
+    Yields ``(mock_client, mock_response)``; tests only override the
+    response text they need.
+    """
+    mock_client = MagicMock()
+    mock_client.messages.create = AsyncMock()
+    mock_response = MagicMock()
+    mock_response.content = [MagicMock(text='{"data": "test"}')]
+    mock_client.messages.create.return_value = mock_response
+
+    sdk = MagicMock()
+    sdk.AsyncAnthropic.return_value = mock_client
+    monkeypatch.setattr("src.agents.anthropic", sdk)
+    yield mock_client, mock_response
+
+
 @pytest.fixture
 def sample_brief():
     """Create a sample research brief for testing."""
@@ -24,46 +82,46 @@ class TestAPIIntegration:
     """Test the Anthropic API integration."""
 
     @pytest.mark.asyncio
-    async def test_call_api_returns_dict(self, sample_brief):
+    async def test_call_api_returns_dict(self, mock_anthropic):
         """API call should return a dictionary."""
         agent = SubAgent(name="TestAgent")
 
-        # Mock the Anthropic client
-        with patch("src.agents.anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_anthropic.Anthropic.return_value = mock_client
-
-            mock_response = MagicMock()
-            mock_response.content = [MagicMock(text='{"findings": "test data"}')]
-            mock_client.messages.create.return_value = mock_response
+        _, mock_response = mock_anthropic
+        mock_response.content[0].text = '{"findings": "test data"}'
 
-            result = await agent._call_api("test prompt")
-            assert isinstance(result, dict)
-            assert "findings" in result
+        result = await agent._call_api("test prompt")
+        assert isinstance(result, dict)
+        assert "findings" in result
 
     @pytest.mark.asyncio
-    async def test_call_api_handles_non_json_response(self, sample_brief):
+    async def test_call_api_handles_non_json_response(self, mock_anthropic):
         """API call should handle non-JSON text response."""
         agent = SubAgent(name="TestAgent")
 
-        with patch("src.agents.anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_anthropic.Anthropic.return_value = mock_client
+        _, mock_response = mock_anthropic
+        mock_response.content[0].text = "This is plain text response"
+
+        result = await agent._call_api("test prompt")
+        assert isinstance(result, dict)
+        assert "response" in result
+
+    @pytest.mark.asyncio
+    async def test_call_api_wraps_non_object_json(self, mock_anthropic):
+        """A JSON array is not a findings object, so it is kept as text."""
+        agent = SubAgent(name="TestAgent")
 
-            mock_response = MagicMock()
-            mock_response.content = [MagicMock(text="This is plain text response")]
-            mock_client.messages.create.return_value = mock_response
+        _, mock_response = mock_anthropic
+        mock_response.content[0].text = '["a", "b"]'
 
-            result = await agent._call_api("test prompt")
-            assert isinstance(result, dict)
-            assert "response" in result
+        result = await agent._call_api("test prompt")
+        assert result["response"] == '["a", "b"]'
 
     @pytest.mark.asyncio
     async def test_agent_run_calls_api(self, sample_brief):
         """Agent.run should call the API with built prompt."""
         agent = CommunityMapper()
 
-        with patch.object(agent, "_call_api", new_callable=AsyncMock) as mock_api:
+        with patch.object(CommunityMapper, "_call_api", new_callable=AsyncMock) as mock_api:
             mock_api.return_value = {"communities": ["reddit.com/r/designers"]}
 
             await agent.run(sample_brief)
@@ -74,19 +132,274 @@ class TestAPIIntegration:
             assert "United States" in call_args
 
     @pytest.mark.asyncio
-    async def test_api_uses_claude_model(self, sample_brief):
+    async def test_api_uses_claude_model(self, mock_anthropic):
         """API should use Claude Sonnet model."""
         agent = SubAgent(name="TestAgent")
 
-        with patch("src.agents.anthropic") as mock_anthropic:
-            mock_client = MagicMock()
-            mock_anthropic.Anthropic.return_value = mock_client
+        mock_client, _ = mock_anthropic
+
+        await agent._call_api("test prompt")
+
+        call_kwargs = mock_client.messages.create.call_args[1]
+        assert "claude" in call_kwargs["model"].lower()
+
+    @pytest.mark.asyncio
+    async def test_call_api_forces_findings_tool(self, mock_anthropic):
+        """JSON agents request the findings tool and read its parsed input."""
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(type="tool_use", input={"communities": ["r/design"]})]
+
+        result = await CommunityMapper()._call_api("test prompt")
+
+        call_kwargs = mock_client.messages.create.call_args[1]
+        assert call_kwargs["tool_choice"] == {"type": "tool", "name": FINDINGS_TOOL_NAME}
+        schema = call_kwargs["tools"][0]["input_schema"]
+        assert "communities" in schema["properties"]
+        assert result["communities"] == ["r/design"]
+
+    @pytest.mark.asyncio
+    async def test_source_verifier_tool_only_asks_for_claims(self, mock_anthropic):
+        """The verifier's sources come from the HTTP check, so the tool asks only for claims."""
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(type="tool_use", input={"unsupported_claims": []})]
+
+        await SourceVerifier()._call_api("test prompt")
+
+        schema = mock_client.messages.create.call_args[1]["tools"][0]["input_schema"]
+        assert list(schema["properties"]) == ["unsupported_claims"]
+
+    @pytest.mark.asyncio
+    async def test_synthesizer_uses_text_mode(self, mock_anthropic):
+        """The synthesizer returns markdown, so no tool is forced."""
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(text="# Report")]
+        mock_client.messages.stream = _fake_stream(mock_response)
+
+        result = await OpportunitySynthesizer()._call_api("test prompt")
+
+        call_kwargs = mock_client.messages.stream.call_args[1]
+        assert "tools" not in call_kwargs
+        assert result["response"] == "# Report"
+
+    @pytest.mark.asyncio
+    async def test_synthesizer_streams_text_deltas(self, mock_anthropic, sample_brief):
+        """Synthesis is streamed and each delta reaches the on_text callback."""
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(text="# Report\nBody")]
+        mock_client.messages.stream = _fake_stream(mock_response, ["# Report", "\nBody"])
+        received = []
+
+        result = await OpportunitySynthesizer().run(
+            sample_brief, findings={}, on_text=received.append
+        )
+
+        mock_client.messages.create.assert_not_called()
+        assert received == ["# Report", "\nBody"]
+        assert result["response"] == "# Report\nBody"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "agent_cls, expected",
+        [
+            (CommunityMapper, 4096),
+            (TrendDetector, 2048),
+            (OpportunitySynthesizer, 8192),
+            (SourceVerifier, 2048),
+        ],
+    )
+    async def test_max_tokens_per_agent(self, mock_anthropic, agent_cls, expected):
+        """Each agent requests its own output token budget."""
+        agent = agent_cls()
+        mock_client, mock_response = mock_anthropic
+        mock_client.messages.stream = _fake_stream(mock_response)
+
+        await agent._call_api("test prompt")
+
+        method = mock_client.messages.stream if agent.stream_output else mock_client.messages.create
+        call_kwargs = method.call_args[1]
+        assert call_kwargs["max_tokens"] == expected
+
+    @pytest.mark.asyncio
+    async def test_truncated_response_logs_warning(self, mock_anthropic, caplog):
+        """A response cut off at max_tokens is flagged in the logs."""
+        _, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(text='{"communities": ["r/design"]}')]
+        mock_response.stop_reason = "max_tokens"
+
+        with caplog.at_level("WARNING", logger="src.agents"):
+            await CommunityMapper()._call_api("test prompt")
+
+        assert "hit its output budget" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_agent_run_marks_static_prefix_cacheable(self, mock_anthropic, sample_brief):
+        """The agent/depth prompt prefix is sent as a cached system block."""
+        agent = CommunityMapper()
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(text='{"communities": ["r/design"]}')]
+
+        await agent.run(sample_brief)
+
+        call_kwargs = mock_client.messages.create.call_args[1]
+        system = call_kwargs["system"]
+        content = call_kwargs["messages"][0]["content"]
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+        assert system[0]["text"] == agent.prompt_prefix(sample_brief.depth)
+        assert system[0]["text"] + content == agent.build_prompt(sample_brief)
+
+    @pytest.mark.asyncio
+    async def test_overloaded_error_is_retried_with_backoff(self, mock_anthropic):
+        """A 529 overloaded_error gets the longer retry budget before failing."""
+        agent = SubAgent(name="TestAgent")
+        mock_client, _ = mock_anthropic
+        mock_client.messages.create.side_effect = anthropic.APIStatusError(
+            "overloaded_error", response=MagicMock(status_code=529), body=None
+        )
+
+        with patch("src.agents.asyncio.sleep", new_callable=AsyncMock) as mock_sleep:
+            with pytest.raises(RuntimeError, match="after 5 attempts"):
+                await agent._call_api("test prompt")
+
+        assert mock_client.messages.create.call_count == 5
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(delays) == 4
+        assert delays == sorted(delays)
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_does_not_sleep_after_last_attempt(self, mock_anthropic, caplog):
+        """The final rate-limited attempt gives up without waiting out retry-after."""
+        from src.agents import MAX_RETRIES
+
+        agent = SubAgent(name="TestAgent")
+        mock_client, _ = mock_anthropic
+        mock_client.messages.create.side_effect = anthropic.RateLimitError(
+            "rate_limit_error",
+            response=MagicMock(status_code=429, headers={"retry-after": "30"}),
+            body=None,
+        )
+
+        with patch("src.agents.asyncio.sleep", new_callable=AsyncMock) as mock_sleep, \
+                caplog.at_level("WARNING", logger="src.agents"):
+            with pytest.raises(RuntimeError, match=f"after {MAX_RETRIES} attempts"):
+                await agent._call_api("test prompt")
+
+        assert mock_sleep.await_count == MAX_RETRIES - 1
+        assert "giving up" in caplog.text
+        assert "retrying in 30.0s" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused_within_event_loop(self, mock_anthropic):
+        """Calls on the same event loop share one AsyncAnthropic client."""
+        from src import agents
+
+        mock_client, _ = mock_anthropic
+        agent = SubAgent(name="TestAgent")
+
+        await agent._call_api("first prompt")
+        await agent._call_api("second prompt")
+
+        assert agents.anthropic.AsyncAnthropic.call_count == 1
+        assert mock_client.messages.create.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_close_client_releases_loop_client(self, mock_anthropic):
+        """close_client closes the loop's client; the next call opens a new one."""
+        from src import agents
+
+        mock_client, _ = mock_anthropic
+        mock_client.close = AsyncMock()
+        agent = SubAgent(name="TestAgent")
+
+        await agent._call_api("first prompt")
+        await agents.close_client()
+
+        mock_client.close.assert_awaited_once()
+        assert asyncio.get_running_loop() not in agents._clients
+
+        await agent._call_api("second prompt")
+        assert agents.anthropic.AsyncAnthropic.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_are_bounded(self, mock_anthropic):
+        """No more than MAX_CONCURRENCY requests are in flight at once."""
+        mock_client, mock_response = mock_anthropic
+        in_flight = 0
+        peak = 0
+
+        async def slow_create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return mock_response
+
+        mock_client.messages.create.side_effect = slow_create
+
+        with patch("src.agents.MAX_CONCURRENCY", 2):
+            agents = [SubAgent(name=f"Agent{i}") for i in range(5)]
+            await asyncio.gather(*(a._call_api(f"prompt {a.name}") for a in agents))
+
+        assert mock_client.messages.create.await_count == 5
+        assert peak == 2
+
+
+class TestResponseCache:
+    """Test the prompt-keyed response cache."""
+
+    @pytest.mark.asyncio
+    async def test_identical_prompt_served_from_cache(self, mock_anthropic):
+        """A repeated prompt should not hit the API a second time."""
+        agent = SubAgent(name="TestAgent")
+        mock_client, mock_response = mock_anthropic
+        mock_response.content[0].text = '{"findings": "test data"}'
+
+        first = await agent._call_api("same prompt")
+        second = await agent._call_api("same prompt")
+
+        assert mock_client.messages.create.call_count == 1
+        assert second["findings"] == first["findings"]
+        assert second["_token_usage"] == {"input_tokens": 0, "output_tokens": 0}
+
+    @pytest.mark.asyncio
+    async def test_cached_report_is_replayed_to_on_text(self, mock_anthropic):
+        """A cache hit still hands the whole report to the streaming callback."""
+        mock_client, mock_response = mock_anthropic
+        mock_response.content = [MagicMock(text="# Report\nBody")]
+        mock_client.messages.stream = _fake_stream(mock_response, ["# Report", "\nBody"])
+        agent = OpportunitySynthesizer()
+
+        await agent._call_api("same prompt")
+        received = []
+        await agent._call_api("same prompt", on_text=received.append)
+
+        assert mock_client.messages.stream.call_count == 1
+        assert received == ["# Report\nBody"]
+
+    @pytest.mark.asyncio
+    async def test_no_cache_bypasses_cache(self, mock_anthropic):
+        """no_cache=True should always call the API."""
+        agent = SubAgent(name="TestAgent")
+        mock_client, _ = mock_anthropic
+
+        await agent._call_api("same prompt")
+        await agent._call_api("same prompt", no_cache=True)
+
+        assert mock_client.messages.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_survives_in_process_cache_reset(self, mock_anthropic, tmp_path):
+        """With a cache directory set, responses are reloaded from disk."""
+        agent = SubAgent(name="TestAgent")
+        mock_client, mock_response = mock_anthropic
+        mock_response.content[0].text = '{"findings": "test data"}'
 
-            mock_response = MagicMock()
-            mock_response.content = [MagicMock(text='{"data": "test"}')]
-            mock_client.messages.create.return_value = mock_response
+        with patch("src.agents.RESPONSE_CACHE_DIR", str(tmp_path)):
+            await agent._call_api("same prompt")
+            assert len(list(tmp_path.glob("*.json"))) == 1
 
-            await agent._call_api("test prompt")
+            clear_response_cache()
+            result = await agent._call_api("same prompt")
 
-            call_kwargs = mock_client.messages.create.call_args[1]
-            assert "claude" in call_kwargs["model"].lower()
+        assert mock_client.messages.create.await_count == 1
+        assert result["findings"] == "test data"
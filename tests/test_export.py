@@ -1,21 +1,38 @@
 """Tests for export functionality."""
 
 import json
+import subprocess
+import sys
+import types
 import zipfile
 from io import BytesIO
 
+import markdown2
+import pytest
 from docx import Document
 
 from src.export import (
+    _FONT_IMPORT,
     _is_table_separator,
+    _iter_inline_tokens,
     _parse_table_row,
+    clear_export_caches,
     create_asset_bundle,
     export_to_docx,
+    export_to_pdf,
     get_filename_from_title,
     markdown_to_html,
 )
 
 
+@pytest.fixture(autouse=True)
+def empty_export_caches():
+    """Start every test without cached renders or exports."""
+    clear_export_caches()
+    yield
+    clear_export_caches()
+
+
 class TestMarkdownToHtml:
     """Tests for markdown to HTML conversion."""
 
@@ -40,6 +57,21 @@ class TestMarkdownToHtml:
         html = markdown_to_html(md)
         assert "<table>" in html
 
+    def test_markdown_rendered_once_per_report(self, monkeypatch):
+        """The HTML and PDF paths reuse one markdown2 render of the same report."""
+        calls = []
+        real_markdown = markdown2.markdown
+
+        def counting_markdown(*args, **kwargs):
+            calls.append(args[0])
+            return real_markdown(*args, **kwargs)
+
+        monkeypatch.setattr(markdown2, "markdown", counting_markdown)
+        md = "# Rendered once\n\nUnique body for this test."
+        create_asset_bundle(md, title="test")
+        markdown_to_html(md)
+        assert calls == [md]
+
     def test_handles_code_blocks(self):
         """Test code block conversion."""
         md = "```python\nprint('hello')\n```"
@@ -47,9 +79,42 @@ class TestMarkdownToHtml:
         assert "<code" in html or "<pre" in html
 
 
+class TestExportToPdf:
+    """Tests for PDF export."""
+
+    def test_pdf_html_skips_remote_font_import(self, monkeypatch):
+        """The HTML handed to WeasyPrint has the same styling minus the Google Fonts fetch."""
+        rendered = []
+
+        class FakeHTML:
+            def __init__(self, string):
+                rendered.append(string)
+
+            def write_pdf(self):
+                return b"%PDF-fake"
+
+        monkeypatch.setitem(sys.modules, "weasyprint", types.SimpleNamespace(HTML=FakeHTML))
+
+        md = "# Title\n\nBody"
+        assert export_to_pdf(md, "Test") == b"%PDF-fake"
+        assert "fonts.googleapis.com" not in rendered[0]
+        assert rendered[0] == markdown_to_html(md).replace(_FONT_IMPORT, "")
+
+
 class TestExportToDocx:
     """Tests for DOCX export."""
 
+    def test_import_defers_renderer_libraries(self):
+        """Importing src.export does not load python-docx or markdown2."""
+        code = (
+            "import sys, src.export; "
+            "print(any(m == 'docx' or m == 'markdown2' for m in sys.modules))"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert out.stdout.strip() == "False"
+
     def test_returns_bytes(self):
         """Test that export returns bytes."""
         md = "# Test Report\n\nSome content."
@@ -57,6 +122,21 @@ class TestExportToDocx:
         assert isinstance(result, bytes)
         assert len(result) > 0
 
+    def test_exports_do_not_share_content(self):
+        """Each export starts from a clean copy of the blank template."""
+        export_to_docx("First report with [a link](https://first.example)", "One")
+        doc = Document(BytesIO(export_to_docx("Second report", "Two")))
+        text = "\n".join(p.text for p in doc.paragraphs)
+        assert "Second report" in text
+        assert "First report" not in text
+        assert "https://first.example" not in {rel.target_ref for rel in doc.part.rels.values()}
+
+    def test_repeat_exports_are_cached(self):
+        """Re-exporting the same report and title reuses the first DOCX."""
+        first = export_to_docx("# Report\n\nBody", title="Cached")
+        assert export_to_docx("# Report\n\nBody", title="Cached") is first
+        assert export_to_docx("# Report\n\nBody", title="Other") is not first
+
     def test_creates_valid_docx(self):
         """Test that output is valid DOCX (ZIP format)."""
         md = "# Test\n\n- Item 1\n- Item 2"
@@ -129,6 +209,27 @@ class TestCreateAssetBundle:
         with zipfile.ZipFile(buffer, "r") as zf:
             assert "test.docx" in zf.namelist()
 
+    def test_writes_into_sink(self, tmp_path):
+        """With a sink the archive is streamed into it instead of returned."""
+        path = tmp_path / "bundle.zip"
+        with open(path, "wb") as sink:
+            assert create_asset_bundle("# Report", title="test", sink=sink) is None
+
+        with zipfile.ZipFile(path, "r") as zf:
+            assert "test.md" in zf.namelist()
+            assert "metadata.json" in zf.namelist()
+
+    def test_compresses_only_text_members(self):
+        """Already-compressed DOCX is stored; text members are deflated."""
+        md = "# Report"
+        result = create_asset_bundle(md, title="test")
+
+        buffer = BytesIO(result)
+        with zipfile.ZipFile(buffer, "r") as zf:
+            assert zf.getinfo("test.docx").compress_type == zipfile.ZIP_STORED
+            assert zf.getinfo("test.md").compress_type == zipfile.ZIP_DEFLATED
+            assert zf.getinfo("test.html").compress_type == zipfile.ZIP_DEFLATED
+
     def test_includes_metadata(self):
         """Test that bundle includes metadata."""
         md = "# Report"
@@ -141,6 +242,26 @@ class TestCreateAssetBundle:
             assert "generated_at" in metadata
             assert metadata["title"] == "test"
 
+    def test_only_requested_formats_are_rendered(self, monkeypatch):
+        """Formats left out of *formats* are neither rendered nor listed."""
+        def fail(*args, **kwargs):
+            raise AssertionError("DOCX should not be rendered")
+
+        monkeypatch.setattr("src.export.export_to_docx", fail)
+        result = create_asset_bundle("# Report", title="test", formats=("md", "html"))
+
+        with zipfile.ZipFile(BytesIO(result), "r") as zf:
+            names = zf.namelist()
+            metadata = json.loads(zf.read("metadata.json"))
+        assert "test.md" in names and "test.html" in names
+        assert "test.docx" not in names and "test.pdf" not in names
+        assert metadata["files_included"] == ["test.md", "test.html"]
+
+    def test_unknown_format_rejected(self):
+        """Asking for a format the bundle cannot produce is an error."""
+        with pytest.raises(ValueError, match="epub"):
+            create_asset_bundle("# Report", formats=("md", "epub"))
+
     def test_includes_raw_findings(self):
         """Test that raw findings are included."""
         md = "# Report"
@@ -229,6 +350,24 @@ class TestInlineFormatting:
             assert "https://example.com" in rels_xml
             doc_xml = zf.read("word/document.xml").decode("utf-8")
             assert "Example" in doc_xml
+            # A real, clickable hyperlink element wraps the link text
+            assert '<w:hyperlink r:id="' in doc_xml
+            assert "[Example]" not in doc_xml
+
+    def test_inline_tokens_match_markdown_precedence(self):
+        """Bold wins over italic, links need both parts, unclosed markers stay plain."""
+        tokens = list(_iter_inline_tokens("**b** *i* [t](u) *open [x] [y]() ***z**"))
+        assert [(kind, inner, url) for _, _, kind, inner, url in tokens] == [
+            ("bold", "b", None),
+            ("italic", "i", None),
+            ("link", "t", "u"),
+            ("italic", "open [x] [y]() ", None),
+            ("bold", "z", None),
+        ]
+
+    def test_unclosed_markers_are_plain_text(self):
+        """A long run of unmatched markers produces no tokens."""
+        assert list(_iter_inline_tokens("[x] " * 5000 + "**z")) == []
 
     def test_mixed_inline_formatting(self):
         """Paragraph with bold, italic, and plain text together."""
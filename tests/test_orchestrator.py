@@ -1,16 +1,27 @@
 """Tests for the research orchestrator."""
 
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
 
+from src.agents import CommunityMapper, LocalContext, OpportunitySynthesizer
 from src.models import ResearchBrief
 from src.orchestrator import ResearchOrchestrator
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def orchestrator():
+    """One orchestrator shared by the tests that only read its configuration.
+
+    Tests that patch agents or run waves build their own instance.
+    """
+    return ResearchOrchestrator()
+
+
+@pytest.fixture(scope="module")
 def sample_brief():
-    """Create a sample research brief for testing."""
+    """Create a sample research brief for testing (briefs are immutable)."""
     return ResearchBrief(
         offering_what="productivity app",
         offering_problem="designers waste time on admin",
@@ -23,9 +34,8 @@ def sample_brief():
 class TestResearchOrchestrator:
     """Test the research orchestrator."""
 
-    def test_orchestrator_has_all_agents(self):
+    def test_orchestrator_has_all_agents(self, orchestrator):
         """Orchestrator initializes with all 8 agents."""
-        orchestrator = ResearchOrchestrator()
         assert len(orchestrator.agents) == 8
         agent_names = [a.name for a in orchestrator.agents]
         assert "CommunityMapper" in agent_names
@@ -37,9 +47,8 @@ class TestResearchOrchestrator:
         assert "OpportunitySynthesizer" in agent_names
         assert "SourceVerifier" in agent_names
 
-    def test_orchestrator_defines_waves(self):
+    def test_orchestrator_defines_waves(self, orchestrator):
         """Orchestrator defines the 5-wave execution order."""
-        orchestrator = ResearchOrchestrator()
         assert len(orchestrator.waves) == 5
 
         # Wave 1: Community Mapper + Local Context
@@ -61,29 +70,123 @@ class TestResearchOrchestrator:
         assert "SourceVerifier" in orchestrator.waves[4]
 
     @pytest.mark.asyncio
-    async def test_run_wave_executes_agents_in_parallel(self, sample_brief):
+    async def test_run_wave_executes_agents_in_parallel(self, sample_brief, monkeypatch):
         """Agents within a wave run in parallel."""
         orchestrator = ResearchOrchestrator()
 
         # Mock all agents
         for agent in orchestrator.agents:
-            agent.run = AsyncMock(return_value={"data": f"{agent.name} results"})
+            monkeypatch.setattr(
+                type(agent), "run", AsyncMock(return_value={"data": f"{agent.name} results"})
+            )
 
         # Run wave 1 (should run CommunityMapper and LocalContext in parallel)
         results = await orchestrator.run_wave(0, sample_brief)
 
         # Both agents should have been called
-        community_mapper = orchestrator.get_agent("CommunityMapper")
-        local_context = orchestrator.get_agent("LocalContext")
-        community_mapper.run.assert_called_once()
-        local_context.run.assert_called_once()
+        CommunityMapper.run.assert_called_once()
+        LocalContext.run.assert_called_once()
 
         # Results should have both
         assert "CommunityMapper" in results
         assert "LocalContext" in results
 
     @pytest.mark.asyncio
-    async def test_run_all_waves_sequential(self, sample_brief):
+    async def test_run_wave_reports_agents_as_they_finish(self, sample_brief, monkeypatch):
+        """Each agent's result is recorded as soon as it finishes, failures included."""
+        orchestrator = ResearchOrchestrator()
+
+        async def slow_run(brief, **kwargs):
+            await asyncio.sleep(0.05)
+            return {"communities": ["r/design"]}
+
+        monkeypatch.setattr(CommunityMapper, "run", AsyncMock(side_effect=slow_run))
+        monkeypatch.setattr(LocalContext, "run", AsyncMock(side_effect=RuntimeError("boom")))
+
+        finished = []
+        results = await orchestrator.run_wave(
+            0, sample_brief, on_agent_complete=lambda name, result: finished.append(name)
+        )
+
+        assert finished == ["LocalContext", "CommunityMapper"]
+        assert list(results) == ["CommunityMapper", "LocalContext"]
+        assert results["LocalContext"] == {"error": "boom"}
+        assert orchestrator.results["CommunityMapper"] == {"communities": ["r/design"]}
+
+    @pytest.mark.asyncio
+    async def test_run_wave_cancels_remaining_agents_when_abandoned(self, sample_brief, monkeypatch):
+        """If a completion callback raises, agents still running are cancelled."""
+        orchestrator = ResearchOrchestrator()
+        cancelled = asyncio.Event()
+
+        async def hanging_run(brief, **kwargs):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        def fail(name, result):
+            raise ValueError("callback failed")
+
+        monkeypatch.setattr(CommunityMapper, "run", AsyncMock(side_effect=hanging_run))
+        monkeypatch.setattr(LocalContext, "run", AsyncMock(return_value={"response": "ok"}))
+
+        with pytest.raises(ValueError, match="callback failed"):
+            await orchestrator.run_wave(0, sample_brief, on_agent_complete=fail)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_synthesizer_gets_read_only_earlier_findings(self, sample_brief, monkeypatch):
+        """The synthesizer sees every earlier result, including failures, but cannot modify them."""
+        orchestrator = ResearchOrchestrator()
+        monkeypatch.setattr(CommunityMapper, "run", AsyncMock(return_value={"communities": ["x"]}))
+        monkeypatch.setattr(LocalContext, "run", AsyncMock(side_effect=RuntimeError("boom")))
+        synthesizer_run = AsyncMock(return_value={"report": "done"})
+        monkeypatch.setattr(OpportunitySynthesizer, "run", synthesizer_run)
+
+        await orchestrator.run_wave(0, sample_brief)
+        await orchestrator.run_wave(3, sample_brief)
+
+        findings = synthesizer_run.await_args.kwargs["findings"]
+        assert dict(findings) == {
+            "CommunityMapper": {"communities": ["x"]},
+            "LocalContext": {"error": "boom"},
+        }
+        with pytest.raises(TypeError):
+            findings["CommunityMapper"] = {}
+
+    @pytest.mark.asyncio
+    async def test_report_text_callback_reaches_synthesizer(self, sample_brief, monkeypatch):
+        """run_all hands on_report_text to the synthesizer as its streaming callback."""
+        orchestrator = ResearchOrchestrator()
+        for agent in orchestrator.agents:
+            monkeypatch.setattr(type(agent), "run", AsyncMock(return_value={"data": "x"}))
+
+        def on_report_text(text):
+            pass
+
+        await orchestrator.run_all(sample_brief, on_report_text=on_report_text)
+
+        assert OpportunitySynthesizer.run.await_args.kwargs["on_text"] is on_report_text
+
+    @pytest.mark.asyncio
+    async def test_no_cache_reaches_every_agent(self, sample_brief, monkeypatch):
+        """ResearchOrchestrator(no_cache=True) asks each agent to skip the response cache."""
+        orchestrator = ResearchOrchestrator(no_cache=True)
+        for agent in orchestrator.agents:
+            monkeypatch.setattr(type(agent), "run", AsyncMock(return_value={"data": "fresh"}))
+
+        await orchestrator.run_wave(0, sample_brief)
+        await orchestrator.run_wave(3, sample_brief)
+        await orchestrator.run_wave(4, sample_brief)
+
+        for name in ("CommunityMapper", "OpportunitySynthesizer", "SourceVerifier"):
+            run = type(orchestrator.get_agent(name)).run
+            assert run.await_args.kwargs["no_cache"] is True
+
+    @pytest.mark.asyncio
+    async def test_run_all_waves_sequential(self, sample_brief, monkeypatch):
         """Waves execute sequentially, agents within wave parallel."""
         orchestrator = ResearchOrchestrator()
         wave_order = []
@@ -99,7 +202,9 @@ class TestResearchOrchestrator:
         for wave_idx, wave_agents in enumerate(orchestrator.waves):
             for agent_name in wave_agents:
                 agent = orchestrator.get_agent(agent_name)
-                agent.run = AsyncMock(side_effect=lambda *a, w=wave_idx, n=agent_name, **k: {"wave": w, "name": n})
+                monkeypatch.setattr(type(agent), "run", AsyncMock(
+                    side_effect=lambda *a, w=wave_idx, n=agent_name, **k: {"wave": w, "name": n}
+                ))
 
         # Run all waves
         all_results = await orchestrator.run_all(sample_brief)
@@ -108,15 +213,64 @@ class TestResearchOrchestrator:
         assert "CommunityMapper" in all_results
         assert "SourceVerifier" in all_results
 
-    def test_get_agent_by_name(self):
+    @pytest.mark.asyncio
+    async def test_run_all_leaves_shared_http_session_to_aclose(self, sample_brief, monkeypatch):
+        """Orchestrators on one loop share the source-check session; aclose closes it."""
+        from src import source_checker
+
+        orchestrators = [ResearchOrchestrator(), ResearchOrchestrator()]
+        for agent in orchestrators[0].agents:
+            monkeypatch.setattr(type(agent), "run", AsyncMock(return_value={"data": "x"}))
+        monkeypatch.setattr(
+            OpportunitySynthesizer, "run",
+            AsyncMock(return_value={"response": "See https://example.com"}),
+        )
+        sessions = []
+
+        async def fake_check(session, url):
+            sessions.append(session)
+            return source_checker.SourceCheckResult(url=url, status="alive", status_code=200)
+
+        monkeypatch.setattr(source_checker, "check_url", fake_check)
+        source_checker.clear_source_check_cache()
+
+        try:
+            await orchestrators[0].run_all(sample_brief)
+            source_checker.clear_source_check_cache()
+            await orchestrators[1].run_all(sample_brief)
+
+            assert len(sessions) == 2 and sessions[0] is sessions[1]
+            assert not sessions[0].closed
+        finally:
+            await ResearchOrchestrator.aclose()
+            source_checker.clear_source_check_cache()
+
+        assert sessions[0].closed
+        assert asyncio.get_running_loop() not in source_checker._sessions
+
+    def test_get_agent_by_name(self, orchestrator):
         """Can retrieve agent by name."""
-        orchestrator = ResearchOrchestrator()
         agent = orchestrator.get_agent("VoiceMiner")
         assert agent is not None
         assert agent.name == "VoiceMiner"
 
-    def test_get_agent_returns_none_for_unknown(self):
+    def test_get_agent_returns_none_for_unknown(self, orchestrator):
         """Returns None for unknown agent name."""
-        orchestrator = ResearchOrchestrator()
         agent = orchestrator.get_agent("UnknownAgent")
         assert agent is None
+
+    def test_token_totals_accumulate_across_agents(self):
+        """Per-agent usage and the running total both grow with each result."""
+        orchestrator = ResearchOrchestrator()
+        orchestrator._extract_token_usage(
+            "VoiceMiner", {"_token_usage": {"input_tokens": 100, "output_tokens": 20}}
+        )
+        orchestrator._extract_token_usage(
+            "VoiceMiner", {"_token_usage": {"input_tokens": 5, "output_tokens": 1}}
+        )
+        result = orchestrator._extract_token_usage(
+            "PricingIntel", {"prices": [], "_token_usage": {"input_tokens": 10}}
+        )
+        assert result == {"prices": []}
+        assert orchestrator.token_usage["VoiceMiner"] == {"input_tokens": 105, "output_tokens": 21}
+        assert orchestrator.get_total_tokens() == 136
@@ -1,5 +1,9 @@
 """Tests for ResearchBrief data structure."""
 
+import dataclasses
+
+import pytest
+
 from src.models import ResearchBrief
 
 
@@ -40,7 +44,7 @@ class TestResearchBrief:
             already_known="designers hate complex UIs",
         )
         assert brief.offering_delivery == "SaaS web app"
-        assert brief.known_competitors == ["Notion", "Asana"]
+        assert brief.known_competitors == ("Notion", "Asana")
         assert brief.kill_criteria == "if WTP < $20/month"
 
     def test_brief_to_dict(self):
@@ -57,6 +61,40 @@ class TestResearchBrief:
         assert data["offering_what"] == "app"
         assert data["primary_question"] == "question"
 
+    def test_brief_to_dict_matches_asdict(self):
+        """to_dict matches dataclasses.asdict but hands out competitors as a list."""
+        brief = ResearchBrief(
+            offering_what="app",
+            offering_problem="problem",
+            target_customer="customer",
+            geography="US",
+            primary_question="question",
+            known_competitors=["Notion"],
+            stage="exploring",
+        )
+        assert brief.markdown  # cached state must not leak into the dict
+        data = brief.to_dict()
+        assert data == {**dataclasses.asdict(brief), "known_competitors": ["Notion"]}
+        data["known_competitors"].append("Asana")
+        assert brief.known_competitors == ("Notion",)
+
+    def test_competitors_cannot_be_mutated_in_place(self):
+        """known_competitors is stored as a tuple, so cached renders stay valid."""
+        competitors = ["Notion"]
+        brief = ResearchBrief(
+            offering_what="app",
+            offering_problem="problem",
+            target_customer="customer",
+            geography="US",
+            primary_question="question",
+            known_competitors=competitors,
+        )
+        competitors.append("Asana")
+        assert brief.known_competitors == ("Notion",)
+        with pytest.raises(AttributeError):
+            brief.known_competitors.append("Asana")
+        assert "Asana" not in brief.markdown
+
     def test_brief_to_markdown(self):
         """Brief can be rendered as markdown for saving."""
         brief = ResearchBrief(
@@ -70,3 +108,43 @@ class TestResearchBrief:
         assert "# Research Brief" in md
         assert "app" in md
         assert "question" in md
+
+    def test_brief_markdown_skips_unset_optional_fields(self):
+        """Only optional fields that were filled in get a line."""
+        brief = ResearchBrief(
+            offering_what="app",
+            offering_problem="problem",
+            target_customer="customer",
+            geography="US",
+            primary_question="question",
+            known_competitors=["Notion", "Asana"],
+            stage="  ",
+        )
+        md = brief.to_markdown()
+        assert "\n## Market Context\n- **Geography:** US\n- **Known Competitors:** Notion, Asana\n" in md
+        assert "**Stage:**" not in md
+        assert md.endswith("## Research Priorities\n- **#1 Question:** question")
+
+    def test_brief_markdown_is_cached(self):
+        """The markdown property renders once and matches to_markdown()."""
+        brief = ResearchBrief(
+            offering_what="app",
+            offering_problem="problem",
+            target_customer="customer",
+            geography="US",
+            primary_question="question",
+        )
+        assert brief.markdown == brief.to_markdown()
+        assert brief.markdown is brief.markdown
+
+    def test_brief_is_immutable(self):
+        """Brief fields cannot be reassigned after validation."""
+        brief = ResearchBrief(
+            offering_what="app",
+            offering_problem="problem",
+            target_customer="customer",
+            geography="US",
+            primary_question="question",
+        )
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            brief.geography = "UK"
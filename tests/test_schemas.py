@@ -2,75 +2,48 @@
 
 import pytest
 
-from src.schemas import AGENT_SCHEMAS, validate_agent_result
+from src.schemas import AGENT_FINDINGS, AGENT_SCHEMAS, validate_agent_result
 
 
 class TestValidResults:
     """Test that valid agent results pass validation."""
 
-    def test_community_mapper_with_expected_keys(self):
-        """CommunityMapper result with expected keys produces no warnings."""
-        result = {
-            "communities": [{"name": "r/freelance", "url": "https://reddit.com/r/freelance"}],
-            "platforms": ["Reddit", "Twitter"],
-        }
-        warnings = validate_agent_result("CommunityMapper", result)
-        assert warnings == []
-
-    def test_voice_miner_with_expected_keys(self):
-        """VoiceMiner result with expected keys produces no warnings."""
-        result = {
-            "quotes": ["I hate invoicing"],
-            "pain_points": ["time tracking"],
-            "desires": ["automation"],
-        }
-        warnings = validate_agent_result("VoiceMiner", result)
-        assert warnings == []
-
-    def test_pricing_intel_with_expected_keys(self):
-        """PricingIntel result with expected keys produces no warnings."""
-        result = {
-            "competitor_pricing": [{"name": "Tool A", "price": "$29/mo"}],
-            "market_rates": {"range": "$20-50/mo"},
-        }
-        warnings = validate_agent_result("PricingIntel", result)
-        assert warnings == []
-
-    def test_competitor_profiler_with_expected_keys(self):
-        """CompetitorProfiler result with expected keys produces no warnings."""
-        result = {"competitors": [{"name": "Notion", "rating": 4.5}]}
-        warnings = validate_agent_result("CompetitorProfiler", result)
-        assert warnings == []
-
-    def test_local_context_with_expected_keys(self):
-        """LocalContext result with expected keys produces no warnings."""
-        result = {
-            "economic_context": {"gdp": "$500B"},
-            "digital_landscape": {"internet_penetration": "85%"},
-        }
-        warnings = validate_agent_result("LocalContext", result)
-        assert warnings == []
-
-    def test_trend_detector_with_expected_keys(self):
-        """TrendDetector result with expected keys produces no warnings."""
-        result = {"trends": [{"topic": "AI tools", "direction": "up"}]}
-        warnings = validate_agent_result("TrendDetector", result)
-        assert warnings == []
-
-    def test_opportunity_synthesizer_with_expected_keys(self):
-        """OpportunitySynthesizer result with expected keys produces no warnings."""
-        result = {"report": "# Market Research Report\n...", "executive_summary": "Summary here"}
-        warnings = validate_agent_result("OpportunitySynthesizer", result)
-        assert warnings == []
-
-    def test_source_verifier_with_expected_keys(self):
-        """SourceVerifier result with expected keys produces no warnings."""
-        result = {
-            "verification_score": 85,
-            "sources": [{"url": "https://example.com", "status": "VERIFIED"}],
-            "unsupported_claims": ["Claim X lacks citation"],
-        }
-        warnings = validate_agent_result("SourceVerifier", result)
+    @pytest.mark.parametrize(
+        ("agent_name", "result"),
+        [
+            ("CommunityMapper", {
+                "communities": [{"name": "r/freelance", "url": "https://reddit.com/r/freelance"}],
+                "platforms": ["Reddit", "Twitter"],
+            }),
+            ("VoiceMiner", {
+                "quotes": ["I hate invoicing"],
+                "pain_points": ["time tracking"],
+                "desires": ["automation"],
+            }),
+            ("PricingIntel", {
+                "competitor_pricing": [{"name": "Tool A", "price": "$29/mo"}],
+                "market_rates": {"range": "$20-50/mo"},
+            }),
+            ("CompetitorProfiler", {"competitors": [{"name": "Notion", "rating": 4.5}]}),
+            ("LocalContext", {
+                "economic_context": {"gdp": "$500B"},
+                "digital_landscape": {"internet_penetration": "85%"},
+            }),
+            ("TrendDetector", {"trends": [{"topic": "AI tools", "direction": "up"}]}),
+            ("OpportunitySynthesizer", {
+                "report": "# Market Research Report\n...",
+                "executive_summary": "Summary here",
+            }),
+            ("SourceVerifier", {
+                "verification_score": 85,
+                "sources": [{"url": "https://example.com", "status": "VERIFIED"}],
+                "unsupported_claims": ["Claim X lacks citation"],
+            }),
+        ],
+    )
+    def test_result_with_expected_keys(self, agent_name, result):
+        """A result with the agent's expected keys produces no warnings."""
+        warnings = validate_agent_result(agent_name, result)
         assert warnings == []
 
     def test_all_agents_covered_in_schema(self):
@@ -87,6 +60,13 @@ class TestValidResults:
         }
         assert set(AGENT_SCHEMAS.keys()) == expected_agents
 
+    def test_schemas_follow_findings_typeddicts(self):
+        """Expected keys come from each agent's findings TypedDict, including 'response'."""
+        for agent_name, findings in AGENT_FINDINGS.items():
+            assert AGENT_SCHEMAS[agent_name] == findings.__optional_keys__
+            assert isinstance(AGENT_SCHEMAS[agent_name], frozenset)
+            assert "response" in AGENT_SCHEMAS[agent_name]
+
 
 class TestResponseFallback:
     """Test that the 'response' fallback key passes validation."""
@@ -8,11 +8,36 @@ import pytest
 from src.source_checker import (
     SourceCheckResult,
     check_url,
+    check_urls,
+    clear_source_check_cache,
+    close_session,
     extract_urls,
     verify_report_sources,
 )
 
 
+class _FakeResponse:
+    """Stand-in for an aiohttp response, used as an async context manager."""
+
+    def __init__(self, status, url):
+        self.status = status
+        self.url = url
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def empty_source_check_cache():
+    """Start every test with an empty URL check cache."""
+    clear_source_check_cache()
+    yield
+    clear_source_check_cache()
+
+
 class TestExtractUrls:
     """Tests for the extract_urls function."""
 
@@ -29,6 +54,16 @@ class TestExtractUrls:
         urls = extract_urls(text)
         assert urls == ["https://example.com", "https://other.com"]
 
+    def test_deduplicates_spellings_of_one_url(self):
+        """Host case and fragments do not make a URL distinct; the first spelling wins."""
+        text = "See https://Example.com/a, https://example.com/a#intro and https://example.com/A"
+        assert extract_urls(text) == ["https://Example.com/a", "https://example.com/A"]
+
+    def test_deduplicates_empty_path_and_root(self):
+        """A bare host and the same host with a trailing slash are one URL."""
+        text = "See https://example.com and https://example.com/ and https://example.com/?q=1"
+        assert extract_urls(text) == ["https://example.com", "https://example.com/?q=1"]
+
     def test_strips_trailing_punctuation(self):
         """Extract URLs strips trailing punctuation that is not part of the URL."""
         text = "See https://example.com. Also https://test.org, and https://foo.bar!"
@@ -71,6 +106,11 @@ class TestSourceCheckResult:
         assert result.redirect_url is None
         assert result.error is None
 
+    def test_has_no_instance_dict(self):
+        """SourceCheckResult stores its fields in slots."""
+        result = SourceCheckResult(url="https://example.com", status="alive")
+        assert not hasattr(result, "__dict__")
+
     def test_creation_with_all_fields(self):
         """SourceCheckResult can be created with all fields."""
         result = SourceCheckResult(
@@ -100,14 +140,8 @@ class TestCheckUrl:
     @pytest.mark.asyncio
     async def test_returns_alive_for_200(self):
         """check_url returns alive status for HTTP 200 response."""
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.url = "https://example.com"
-        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_response.__aexit__ = AsyncMock(return_value=False)
-
-        mock_session = AsyncMock()
-        mock_session.head = MagicMock(return_value=mock_response)
+        mock_session = MagicMock()
+        mock_session.head.return_value = _FakeResponse(200, "https://example.com")
 
         result = await check_url(mock_session, "https://example.com")
         assert result.status == "alive"
@@ -116,23 +150,29 @@ class TestCheckUrl:
     @pytest.mark.asyncio
     async def test_returns_dead_for_404(self):
         """check_url returns dead status for HTTP 404 response."""
-        mock_response = AsyncMock()
-        mock_response.status = 404
-        mock_response.url = "https://example.com/missing"
-        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
-        mock_response.__aexit__ = AsyncMock(return_value=False)
-
-        mock_session = AsyncMock()
-        mock_session.head = MagicMock(return_value=mock_response)
+        mock_session = MagicMock()
+        mock_session.head.return_value = _FakeResponse(404, "https://example.com/missing")
 
         result = await check_url(mock_session, "https://example.com/missing")
         assert result.status == "dead"
         assert result.status_code == 404
 
+    @pytest.mark.asyncio
+    async def test_head_not_allowed_falls_back_to_range_get(self):
+        """A 405 on HEAD is retried as a one-byte ranged GET; 206 means alive."""
+        mock_session = MagicMock()
+        mock_session.head.return_value = _FakeResponse(405, "https://example.com")
+        mock_session.get.return_value = _FakeResponse(206, "https://example.com")
+
+        result = await check_url(mock_session, "https://example.com")
+        assert result.status == "alive"
+        assert result.status_code == 206
+        assert mock_session.get.call_args.kwargs["headers"]["Range"] == "bytes=0-0"
+
     @pytest.mark.asyncio
     async def test_returns_invalid_for_malformed_url(self):
         """check_url returns invalid status for a malformed URL."""
-        mock_session = AsyncMock()
+        mock_session = MagicMock()
         result = await check_url(mock_session, "not-a-url")
         assert result.status == "invalid"
         assert result.error == "Malformed URL"
@@ -140,14 +180,146 @@ class TestCheckUrl:
     @pytest.mark.asyncio
     async def test_returns_timeout_on_timeout(self):
         """check_url returns timeout status when request times out."""
-        mock_session = AsyncMock()
-        mock_session.head = MagicMock(side_effect=asyncio.TimeoutError())
+        mock_session = MagicMock()
+        mock_session.head.side_effect = asyncio.TimeoutError()
 
         result = await check_url(mock_session, "https://slow.example.com")
         assert result.status == "timeout"
         assert result.error == "Request timed out"
 
 
+class TestCheckUrls:
+    """Tests for the check_urls function."""
+
+    @pytest.fixture(autouse=True)
+    async def close_pooled_session(self):
+        """Close the pooled session each test's event loop opened."""
+        yield
+        await close_session()
+
+    @pytest.mark.asyncio
+    async def test_session_is_reused_across_calls(self):
+        """Verifications on one event loop share a single pooled session."""
+        sessions = []
+
+        async def fake_check(session, url):
+            sessions.append(session)
+            return SourceCheckResult(url=url, status="alive", status_code=200)
+
+        with patch("src.source_checker.check_url", side_effect=fake_check):
+            await check_urls(["https://a.com"])
+            await check_urls(["https://b.com"])
+
+        assert sessions[0] is sessions[1]
+        assert sessions[0].connector.limit_per_host == 4
+
+    @pytest.mark.asyncio
+    async def test_overlapping_checks_share_one_request(self):
+        """Concurrent checks of the same URL are coalesced into one request."""
+        calls = []
+
+        async def fake_check(session, url):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return SourceCheckResult(url=url, status="alive", status_code=200)
+
+        with patch("src.source_checker.check_url", side_effect=fake_check):
+            first, second = await asyncio.gather(
+                check_urls(["https://a.com", "https://b.com"]),
+                check_urls(["https://a.com"]),
+            )
+            assert first[0] is second[0]
+            assert sorted(calls) == ["https://a.com", "https://b.com"]
+
+    @pytest.mark.asyncio
+    async def test_overlapping_spellings_share_one_request(self):
+        """Concurrent checks of two spellings of one URL send one request."""
+        calls = []
+
+        async def fake_check(session, url):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return SourceCheckResult(url=url, status="alive", status_code=200)
+
+        with patch("src.source_checker.check_url", side_effect=fake_check):
+            (first,), (second,) = await asyncio.gather(
+                check_urls(["https://Example.com/a"]),
+                check_urls(["https://example.com/a#x"]),
+            )
+
+        assert calls == ["https://Example.com/a"]
+        assert first.url == "https://Example.com/a"
+        assert second.url == "https://example.com/a#x"
+        assert second.status == "alive"
+
+    @pytest.mark.asyncio
+    async def test_recent_results_are_reused_until_they_expire(self):
+        """Live URLs are cached for a day, failures only for an hour."""
+        calls = []
+
+        async def fake_check(session, url):
+            calls.append(url)
+            status = "alive" if "good" in url else "dead"
+            return SourceCheckResult(url=url, status=status, status_code=200)
+
+        urls = ["https://good.com", "https://bad.com"]
+        with patch("src.source_checker.check_url", side_effect=fake_check), \
+                patch("src.source_checker.time.time", return_value=1000.0) as clock:
+            await check_urls(urls)
+            results = await check_urls(urls)
+            assert len(calls) == 2
+            assert [r.status for r in results] == ["alive", "dead"]
+
+            clock.return_value = 1000.0 + 2 * 3600
+            await check_urls(urls)
+            assert calls == ["https://good.com", "https://bad.com", "https://bad.com"]
+
+    @pytest.mark.asyncio
+    async def test_cache_ignores_host_case_and_fragment(self):
+        """Spellings of one URL share a cached result labelled with the URL asked for."""
+        check = AsyncMock(return_value=SourceCheckResult(
+            url="https://example.com/a", status="alive", status_code=200,
+        ))
+        with patch("src.source_checker.check_url", check):
+            await check_urls(["https://example.com/a"])
+            (result,) = await check_urls(["HTTPS://Example.com/a#intro"])
+            await check_urls(["https://example.com/A"])  # paths stay case-sensitive
+
+        assert check.await_count == 2
+        assert result.url == "HTTPS://Example.com/a#intro"
+        assert result.status == "alive"
+
+    @pytest.mark.asyncio
+    async def test_cache_treats_empty_path_as_root(self):
+        """``https://example.com`` and ``https://example.com/`` share a cache entry."""
+        check = AsyncMock(return_value=SourceCheckResult(
+            url="https://example.com", status="alive", status_code=200,
+        ))
+        with patch("src.source_checker.check_url", check):
+            await check_urls(["https://example.com"])
+            (result,) = await check_urls(["https://example.com/"])
+
+        assert check.await_count == 1
+        assert result.url == "https://example.com/"
+
+    @pytest.mark.asyncio
+    async def test_disk_cache_survives_restart(self, tmp_path):
+        """With SOURCE_CHECK_CACHE_DIR set, results are reused after the memory cache is gone."""
+        check = AsyncMock(return_value=SourceCheckResult(
+            url="https://a.com", status="alive", status_code=200,
+        ))
+        with patch("src.source_checker.check_url", check), \
+                patch("src.source_checker.SOURCE_CHECK_CACHE_DIR", str(tmp_path)):
+            await check_urls(["https://a.com"])
+            assert len(list(tmp_path.glob("*.json"))) == 1
+
+            clear_source_check_cache()
+            (result,) = await check_urls(["https://a.com"])
+
+        assert check.await_count == 1
+        assert result == SourceCheckResult(url="https://a.com", status="alive", status_code=200)
+
+
 class TestVerifyReportSources:
     """Tests for the verify_report_sources function."""
 